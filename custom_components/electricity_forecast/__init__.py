@@ -2,22 +2,32 @@
 from __future__ import annotations
 
 import logging
-from datetime import timedelta
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN
-from .api import ElectricityForecastAPI
+from .battery import battery_from_config
+from .charging import ChargingPlanner
+from .const import CONF_MAX_STALENESS, DEFAULT_MAX_STALENESS, DOMAIN
+from .coordinator import STORAGE_VERSION, ElectricityForecastCoordinator, storage_key
+from .hub import async_get_hub, async_release_hub
+from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [Platform.SENSOR, Platform.BINARY_SENSOR]
 
-SCAN_INTERVAL = timedelta(minutes=10)  # Update every 10 minutes
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Electricity Price Forecast services."""
+    async_setup_services(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -25,35 +35,38 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     api_url = entry.data["api_url"]
     region_id = entry.data.get("region_id", "DE")
 
-    session = async_get_clientsession(hass)
-    api = ElectricityForecastAPI(api_url, session, region_id)
-
-    async def async_update_data():
-        """Fetch data from API."""
-        try:
-            _LOGGER.debug("Fetching data from API: %s", api_url)
-            data = await api.async_get_all_data()
-            _LOGGER.debug("Successfully fetched data for region %s", region_id)
-            return data
-        except Exception as err:
-            _LOGGER.error("Error communicating with API %s: %s", api_url, err)
-            raise UpdateFailed(f"Error communicating with API: {err}")
-
-    coordinator = DataUpdateCoordinator(
-        hass,
-        _LOGGER,
-        name=DOMAIN,
-        update_method=async_update_data,
-        update_interval=SCAN_INTERVAL,
+    # Entries pointing at the same backend share one fetch hub
+    hub = async_get_hub(hass, api_url)
+    api = hub.create_api(
+        region_id, entry.data.get(CONF_MAX_STALENESS, DEFAULT_MAX_STALENESS) * 3600
     )
 
-    await coordinator.async_config_entry_first_refresh()
+    coordinator = ElectricityForecastCoordinator(hass, entry, api)
+
+    # Start from the last good snapshot so entities have state right away and
+    # setup does not depend on the backend; refresh in the background.
+    if await coordinator.async_load_cache():
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} initial refresh {region_id}"
+        )
+    else:
+        await coordinator.async_config_entry_first_refresh()
 
+    planner = ChargingPlanner()
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = {
         "coordinator": coordinator,
         "api": api,
+        "hub": hub,
+        "battery": battery_from_config(entry.data),
+        "charging": planner,
     }
+    hub.async_attach(entry.entry_id, coordinator)
+    entry.async_on_unload(coordinator.async_track_clock())
+    # Registered before the platforms, so entities see the updated plan
+    entry.async_on_unload(
+        coordinator.async_add_listener(lambda: planner.async_update(coordinator.data))
+    )
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
@@ -63,6 +76,12 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        entry_data = hass.data[DOMAIN].pop(entry.entry_id)
+        async_release_hub(hass, entry_data["hub"], entry.entry_id)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the cached snapshot of a deleted config entry."""
+    await Store(hass, STORAGE_VERSION, storage_key(entry.entry_id)).async_remove()
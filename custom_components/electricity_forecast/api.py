@@ -1,140 +1,499 @@
 """API client for Electricity Price Forecast."""
 from __future__ import annotations
 
-from datetime import datetime, timedelta
-from typing import Any
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+from bisect import bisect_right
+from collections.abc import Awaitable, Callable
+from functools import partial
+from typing import Any, NamedTuple, TypeVar
+from urllib.parse import urlencode
 
 import aiohttp
 
+from homeassistant.util.json import json_loads
+
+from .const import DEFAULT_MAX_STALENESS
+from .decode import PriceColumns, decode_forecast, decode_historical
+from .history import HistoryBuffer
+from .metrics import EndpointMetrics
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# Shared deadline for all requests of one refresh, in seconds
+REFRESH_TIMEOUT = 30
+
+# Hours of history kept per region
+HISTORY_HOURS = 168
+
+# Ring buffer capacity, large enough for 15-minute resolution
+HISTORY_CAPACITY = HISTORY_HOURS * 4
+
+# Latest historical price older than this is considered stale, in seconds
+CURRENT_PRICE_MAX_AGE = 2 * 3600
+
+# Requests a client (or a shared hub) runs against the backend at once
+MAX_CONCURRENT_REQUESTS = 4
+
+# Cached responses not revalidated for this long are evicted, in seconds
+RESPONSE_CACHE_TTL = 3600
+
+# Retries of a request failing with a transient error, and the first delay
+# (doubling per attempt), in seconds
+REQUEST_RETRIES = 2
+RETRY_BACKOFF = 1.0
+
+# Consecutive failed requests after which the backend is considered down,
+# and the first and longest wait before probing it again, in seconds
+BREAKER_THRESHOLD = 5
+BREAKER_BACKOFF = 30.0
+BREAKER_MAX_BACKOFF = 1800.0
+
+
+def backoff_delay(attempt: int, base: float, maximum: float = math.inf) -> float:
+    """Return an exponential backoff delay with jitter (half fixed, half random)."""
+    delay = min(maximum, base * 2**attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def is_transient(err: Exception) -> bool:
+    """Return whether an error may go away when retried."""
+    if isinstance(err, aiohttp.ClientResponseError):
+        return err.status >= 500 or err.status == 429
+    # Truncated or undecodable JSON (orjson's error subclasses the stdlib one);
+    # a payload with malformed rows raises PayloadError and fails the same
+    # way on every attempt
+    return isinstance(err, (aiohttp.ClientError, asyncio.TimeoutError, json.JSONDecodeError))
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of a request while the backend is considered down."""
+
+
+class CircuitBreaker:
+    """Stop requesting a failing backend and probe it with growing backoff.
+
+    After BREAKER_THRESHOLD consecutive transient failures the circuit opens
+    and requests fail fast. Once the backoff elapsed a single request is let
+    through as a probe: success closes the circuit, failure opens it again
+    for twice as long, up to BREAKER_MAX_BACKOFF.
+
+    Only the tripping failure and the probe's outcome change the backoff.
+    Requests sent before the circuit last opened or closed were in flight
+    across the change; their failures are ignored, so they neither reopen
+    nor extend the circuit.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the breaker."""
+        self.failures = 0
+        self.openings = 0
+        # When a probe may be sent (epoch), None while closed
+        self.retry_at: float | None = None
+        # When the pending probe was let through (epoch), None without one
+        self._probe_at: float | None = None
+        # When the circuit last opened or closed (epoch)
+        self._changed_at = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        """Return whether requests are currently held back."""
+        return self.retry_at is not None
+
+    def check(self) -> None:
+        """Raise CircuitOpenError unless a request may be sent now."""
+        if self.retry_at is None:
+            return
+        now = time.time()
+        if now < self.retry_at:
+            raise CircuitOpenError(
+                f"Backend unavailable, next attempt in {self.retry_at - now:.0f}s"
+            )
+        # Let this probe through; hold back others until it resolves or times out
+        self._probe_at = now
+        self.retry_at = now + REFRESH_TIMEOUT
+
+    def record_success(self) -> None:
+        """Record a response from the backend, closing the circuit."""
+        if self.retry_at is not None:
+            _LOGGER.info("Backend reachable again")
+            self._changed_at = time.time()
+        self.failures = 0
+        self.openings = 0
+        self.retry_at = None
+        self._probe_at = None
+
+    def record_failure(self, sent_at: float) -> None:
+        """Record a transient failure of a request sent at ``sent_at`` (epoch)."""
+        if sent_at < self._changed_at:
+            return
+        self.failures += 1
+        if self.retry_at is None:
+            if self.failures < BREAKER_THRESHOLD:
+                return
+        elif self._probe_at is None or sent_at < self._probe_at:
+            # Open already; only the probe's failure backs off further
+            return
+
+        delay = backoff_delay(self.openings, BREAKER_BACKOFF, BREAKER_MAX_BACKOFF)
+        self.openings += 1
+        self._probe_at = None
+        self._changed_at = time.time()
+        self.retry_at = self._changed_at + delay
+        _LOGGER.warning(
+            "Backend failed %d times in a row, pausing requests for %.0fs", self.failures, delay
+        )
+
+
+class CachedResponse(NamedTuple):
+    """Decoded response body with its HTTP validators."""
+
+    etag: str | None
+    last_modified: str | None
+    data: Any
+    stored_at: float
+
+
+class SingleFlight:
+    """Share one in-flight call per key between concurrent callers.
+
+    Callers asking for a key that is already running await the same task
+    and get its result or error instead of starting the call again.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the in-flight registry."""
+        self._in_flight: dict[str, asyncio.Task] = {}
+
+    async def async_run(self, key: str, call: Callable[[], Awaitable[_T]]) -> _T:
+        """Run ``call`` unless one for the same key is already in flight."""
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._in_flight[key] = task
+            task.add_done_callback(partial(self._call_done, key))
+        # Shield so one cancelled waiter does not cancel the shared call
+        return await asyncio.shield(task)
+
+    def _call_done(self, key: str, task: asyncio.Task) -> None:
+        """Forget a finished call."""
+        self._in_flight.pop(key, None)
+        if not task.cancelled():
+            # Waiters re-raise errors themselves; avoid "never retrieved" noise
+            task.exception()
+
+
+class RequestGate(SingleFlight):
+    """Limit concurrent requests and share identical in-flight ones."""
+
+    def __init__(self, limit: int = MAX_CONCURRENT_REQUESTS) -> None:
+        """Initialize the gate."""
+        super().__init__()
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def async_run(self, key: str, request: Callable[[], Awaitable[_T]]) -> _T:
+        """Run ``request`` within the limit unless an identical one is in flight."""
+        return await super().async_run(key, partial(self._async_limited, request))
+
+    async def _async_limited(self, request: Callable[[], Awaitable[_T]]) -> _T:
+        """Run a request within the concurrency limit."""
+        async with self._semaphore:
+            return await request()
+
 
 class ElectricityForecastAPI:
     """API client for electricity price forecasts."""
 
-    def __init__(self, api_url: str, session: aiohttp.ClientSession, region_id: str = "DE"):
+    def __init__(
+        self,
+        api_url: str,
+        session: aiohttp.ClientSession,
+        region_id: str = "DE",
+        gate: RequestGate | None = None,
+        breaker: CircuitBreaker | None = None,
+        max_staleness: float = DEFAULT_MAX_STALENESS * 3600,
+        retries: int = REQUEST_RETRIES,
+    ):
         """Initialize the API client."""
         self.api_url = api_url.rstrip("/")
         self.session = session
         self.region_id = region_id
+        self.retries = retries
+        # Age up to which a failed fetch is covered by earlier data, in seconds
+        self.max_staleness = max_staleness
+        self._gate = gate or RequestGate()
+        self._breaker = breaker or CircuitBreaker()
+        # Last successful result and its fetch time (epoch) per endpoint
+        self._last_good: dict[str, tuple[Any, float]] = {}
+        # Overlapping refreshes of this region share one fetch
+        self._refresh = SingleFlight()
+        self._history = HistoryBuffer(HISTORY_CAPACITY)
+        self._cache: dict[str, CachedResponse] = {}
+        # Counters per endpoint, see async_get_all_data for the names
+        self.metrics: dict[str, EndpointMetrics] = {}
 
-    async def async_get_current_price(self) -> dict[str, Any]:
-        """Get current electricity price."""
-        url = f"{self.api_url}/api/historical/{self.region_id}/combined"
-        params = {"hours": 1}
+    async def _async_get_json(
+        self,
+        endpoint: str,
+        url: str,
+        params: dict[str, Any] | None = None,
+        decode: Callable[[bytes], Any] = json_loads,
+    ) -> Any:
+        """GET a JSON payload through the request gate and circuit breaker.
+
+        Transient errors are retried with exponential backoff; the waits
+        happen outside the gate so they do not hold a request slot.
+        """
+        key = f"{url}?{urlencode(sorted(params.items()))}" if params else url
+        metrics = self.metrics.setdefault(endpoint, EndpointMetrics())
+
+        async def request() -> Any:
+            sent_at = time.time()
+            try:
+                data = await self._async_fetch_json(key, url, params, decode, metrics)
+            except Exception as err:
+                metrics.record_failure()
+                if is_transient(err):
+                    self._breaker.record_failure(sent_at)
+                else:
+                    # The backend answered, it is just not a usable answer
+                    self._breaker.record_success()
+                raise
+            self._breaker.record_success()
+            return data
+
+        for attempt in range(self.retries + 1):
+            self._breaker.check()
+            try:
+                return await self._gate.async_run(key, request)
+            except Exception as err:
+                if attempt == self.retries or not is_transient(err):
+                    raise
+                delay = backoff_delay(attempt, RETRY_BACKOFF)
+                _LOGGER.debug("Retrying %s in %.1fs after %r", url, delay, err)
+            await asyncio.sleep(delay)
+
+    async def _async_fetch_json(
+        self,
+        key: str,
+        url: str,
+        params: dict[str, Any] | None,
+        decode: Callable[[bytes], Any],
+        metrics: EndpointMetrics,
+    ) -> Any:
+        """GET a JSON payload and decode the raw body with ``decode``.
+
+        The body is read once as bytes and handed to the decoder, which
+        turns price payloads straight into columns.
+
+        Responses carrying an ETag or Last-Modified header are cached per
+        URL. The next request sends them back as If-None-Match and
+        If-Modified-Since; a 304 reuses the decoded body without parsing.
+        """
+        now = time.monotonic()
+
+        # Evict entries that have not been revalidated for a while
+        for stale_key in [k for k, v in self._cache.items() if now - v.stored_at > RESPONSE_CACHE_TTL]:
+            del self._cache[stale_key]
+
+        headers = {}
+        cached = self._cache.get(key)
+        if cached:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        async with self.session.get(url, params=params, headers=headers, timeout=30) as response:
+            if response.status == 304 and cached:
+                metrics.record_response(time.monotonic() - now, 0, None)
+                self._cache[key] = cached._replace(stored_at=now)
+                return cached.data
 
-        async with self.session.get(url, params=params, timeout=30) as response:
             response.raise_for_status()
-            data = await response.json()
-
-            # Backend returns data in "data" key, not "historical_data"
-            if data.get("data") and len(data["data"]) > 0:
-                latest = data["data"][-1]
-                return {
-                    "price": latest["price"],
-                    "timestamp": latest["timestamp"],
-                }
-            return None
-
-    async def async_get_predictions(self, hours: int = 24) -> list[dict[str, Any]]:
+            body = await response.read()
+            received = time.monotonic()
+            data = decode(body)
+            metrics.record_response(received - now, len(body), time.monotonic() - received)
+
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if etag or last_modified:
+                self._cache[key] = CachedResponse(etag, last_modified, data, now)
+            else:
+                self._cache.pop(key, None)
+            return data
+
+    async def async_check_health(self) -> None:
+        """Check that the backend's health endpoint answers with a success status.
+
+        A single request outside the gate and circuit breaker; the body is
+        not read.
+        """
+        async with self.session.get(
+            f"{self.api_url}/health", timeout=REFRESH_TIMEOUT
+        ) as response:
+            response.raise_for_status()
+
+    async def async_get_predictions(self, hours: int = 24) -> PriceColumns:
         """Get price predictions."""
         url = f"{self.api_url}/api/predictions/{self.region_id}/next-24h" if hours <= 24 else f"{self.api_url}/api/predictions/{self.region_id}/next-7d"
+        endpoint = "predictions_24h" if hours <= 24 else "predictions_7d"
 
-        async with self.session.get(url, timeout=30) as response:
-            response.raise_for_status()
-            return await response.json()
+        return await self._async_get_json(endpoint, url, decode=decode_forecast)
 
-    async def async_get_historical_data(self, hours: int = 168) -> dict[str, Any]:
+    async def async_get_historical_data(self, hours: int = 168) -> PriceColumns:
         """Get historical data."""
         url = f"{self.api_url}/api/historical/{self.region_id}/combined"
         params = {"hours": hours}
 
-        async with self.session.get(url, params=params, timeout=30) as response:
-            response.raise_for_status()
-            result = await response.json()
-            # Return just the data array for consistency
-            return result.get("data", [])
+        return await self._async_get_json("historical", url, params, decode_historical)
+
+    async def async_sync_historical(self, hours: int = HISTORY_HOURS) -> PriceColumns:
+        """Bring the local history up to date and return the last ``hours``.
+
+        Only the window since the newest known point is requested. A full
+        resync happens on the first call (e.g. after a restart), when the
+        buffer is older than the requested window, or when the delta does
+        not overlap the stored data (gap on the backend side).
+        """
+        now = time.time()
+        last = self._history.last_timestamp
+
+        if last is not None and now - last < hours * 3600:
+            # Request one extra hour so the window overlaps the newest point
+            delta_hours = math.ceil((now - last) / 3600) + 1
+            delta = await self.async_get_historical_data(delta_hours)
+            if not delta.timestamps or delta.timestamps[0] <= last:
+                added = self._history.extend(delta.timestamps, delta.prices)
+                _LOGGER.debug(
+                    "Incremental history sync for %s: %d new points (%dh window)",
+                    self.region_id,
+                    added,
+                    delta_hours,
+                )
+                return self._history.columns(since=now - hours * 3600)
+            _LOGGER.debug("Gap in history for %s, resyncing", self.region_id)
+
+        full = await self.async_get_historical_data(hours)
+        self._history.clear()
+        self._history.extend(full.timestamps, full.prices)
+        _LOGGER.debug(
+            "Full history sync for %s: %d points", self.region_id, len(full.timestamps)
+        )
+        return self._history.columns(since=now - hours * 3600)
 
     async def async_get_all_data(self) -> dict[str, Any]:
-        """Fetch all relevant data."""
-        # Get predictions for next 24h and 7d
-        predictions_24h = await self.async_get_predictions(24)
-        predictions_7d = await self.async_get_predictions(168)
+        """Fetch all relevant data, sharing a fetch already in flight.
+
+        Refreshes can overlap (manual entity updates, reloads, the hub's
+        schedule); they await the same fetch instead of starting another.
+        """
+        return await self._refresh.async_run("all", self._async_fetch_all_data)
+
+    async def _async_fetch_all_data(self) -> dict[str, Any]:
+        """Fetch all endpoints.
 
-        # Get historical data (last 7 days)
-        historical = await self.async_get_historical_data(168)
+        The endpoints are independent, so they are requested concurrently
+        under one shared deadline. The time each request took is returned
+        under ``timings`` (seconds per endpoint).
 
-        # Get current price
-        current = await self.async_get_current_price()
+        An endpoint that fails while others succeed is filled in with its
+        last good result, if younger than ``max_staleness``, and listed
+        under ``stale``. When every endpoint fails, or a failed one has
+        nothing recent to fall back to, the first error is raised.
+        """
+        timings: dict[str, float] = {}
+
+        async def timed(name: str, request):
+            start = time.monotonic()
+            try:
+                return await asyncio.wait_for(request, REFRESH_TIMEOUT)
+            finally:
+                timings[name] = round(time.monotonic() - start, 3)
+
+        # Predictions for next 24h and 7d and historical data (last 7 days)
+        requests = {
+            "predictions_24h": self.async_get_predictions(24),
+            "predictions_7d": self.async_get_predictions(168),
+            "historical": self.async_sync_historical(),
+        }
+        results = await asyncio.gather(
+            *(timed(name, request) for name, request in requests.items()),
+            return_exceptions=True,
+        )
+
+        now = time.time()
+        data: dict[str, Any] = {}
+        errors: dict[str, BaseException] = {}
+        for name, result in zip(requests, results):
+            if isinstance(result, BaseException):
+                errors[name] = result
+            else:
+                data[name] = result
+                self._last_good[name] = (result, now)
+
+        if len(errors) == len(requests):
+            raise next(iter(errors.values()))
+
+        for name, err in errors.items():
+            last_good = self._last_good.get(name)
+            if last_good is None or now - last_good[1] > self.max_staleness:
+                raise err
+            _LOGGER.warning(
+                "Fetching %s for %s failed, keeping data from %.0f minutes ago: %s",
+                name,
+                self.region_id,
+                (now - last_good[1]) / 60,
+                err,
+            )
+            data[name] = last_good[0]
 
         return {
-            "current_price": current,
-            "predictions_24h": predictions_24h,
-            "predictions_7d": predictions_7d,
-            "historical": historical,
+            "current_price": self.get_current_price(data["historical"], data["predictions_24h"]),
+            **data,
+            "stale": list(errors),
+            "timings": timings,
         }
 
-    def get_cheapest_hours(self, predictions: list[dict], hours: int = 3) -> list[dict]:
-        """Get N cheapest hours from predictions."""
-        # Filter to only today's predictions
-        from datetime import timezone
-        now = datetime.now(timezone.utc)
-        today_end = now.replace(hour=23, minute=59, second=59, microsecond=0)
-
-        today_predictions = [
-            p for p in predictions
-            if now <= datetime.fromisoformat(p["timestamp"].replace("Z", "+00:00")) <= today_end
-        ]
-
-        # Sort by price
-        sorted_predictions = sorted(today_predictions, key=lambda x: x["predicted_price"])
-        return sorted_predictions[:hours]
-
-    def get_expensive_hours(self, predictions: list[dict], hours: int = 3) -> list[dict]:
-        """Get N most expensive hours from predictions."""
-        # Filter to only today's predictions
-        from datetime import timezone
-        now = datetime.now(timezone.utc)
-        today_end = now.replace(hour=23, minute=59, second=59, microsecond=0)
-
-        today_predictions = [
-            p for p in predictions
-            if now <= datetime.fromisoformat(p["timestamp"].replace("Z", "+00:00")) <= today_end
-        ]
-
-        # Sort by price descending
-        sorted_predictions = sorted(today_predictions, key=lambda x: x["predicted_price"], reverse=True)
-        return sorted_predictions[:hours]
-
-    def get_recommendation(self, current_price: float, predictions: list[dict]) -> str:
-        """Get recommendation based on current price vs forecast."""
-        if not predictions:
-            return "unknown"
-
-        # Get today's predictions
-        from datetime import timezone
-        now = datetime.now(timezone.utc)
-        today_end = now.replace(hour=23, minute=59, second=59, microsecond=0)
-
-        today_predictions = [
-            p["predicted_price"] for p in predictions
-            if now <= datetime.fromisoformat(p["timestamp"].replace("Z", "+00:00")) <= today_end
-        ]
-
-        if not today_predictions:
-            return "unknown"
-
-        avg_price = sum(today_predictions) / len(today_predictions)
-        min_price = min(today_predictions)
-        max_price = max(today_predictions)
-
-        # Calculate thresholds (bottom 25% = cheap, top 25% = expensive)
-        cheap_threshold = min_price + (max_price - min_price) * 0.25
-        expensive_threshold = min_price + (max_price - min_price) * 0.75
-
-        if current_price <= cheap_threshold:
-            return "charge"  # Good time to charge batteries / run appliances
-        elif current_price >= expensive_threshold:
-            return "discharge"  # Good time to use stored energy / sell to grid
-        elif current_price < avg_price:
-            return "neutral_cheap"
-        else:
-            return "neutral_expensive"
+    def get_current_price(
+        self, historical: PriceColumns, predictions: PriceColumns
+    ) -> dict[str, Any] | None:
+        """Get the current price from the latest historical data point.
+
+        The historical endpoint's last row is the current price, so no extra
+        request is needed. When that row is stale (backend lagging behind),
+        fall back to the forecast for the current hour.
+        """
+        now = time.time()
+
+        if historical.timestamps and now - historical.timestamps[-1] <= CURRENT_PRICE_MAX_AGE:
+            return {
+                "price": historical.prices[-1],
+                "timestamp": historical.times[-1],
+                "source": "historical",
+            }
+
+        # Most recent forecast slot that has already started
+        forecast = bisect_right(predictions.timestamps, now) - 1
+
+        if forecast >= 0:
+            return {
+                "price": predictions.prices[forecast],
+                "timestamp": predictions.times[forecast],
+                "source": "forecast",
+            }
+
+        if historical.timestamps:
+            return {
+                "price": historical.prices[-1],
+                "timestamp": historical.times[-1],
+                "source": "historical",
+            }
+        return None
@@ -0,0 +1,103 @@
+"""Battery charge/discharge planning for Electricity Price Forecast."""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    CONF_BATTERY_CAPACITY,
+    CONF_BATTERY_CHARGE_POWER,
+    CONF_BATTERY_DISCHARGE_POWER,
+    CONF_BATTERY_EFFICIENCY,
+    DEFAULT_BATTERY_CAPACITY,
+    DEFAULT_BATTERY_EFFICIENCY,
+    DEFAULT_BATTERY_POWER,
+)
+from .optimize import Battery, BatteryPlan, battery_levels, battery_schedule
+from .snapshot import PriceSeries, PriceSnapshot
+
+ACTION_CHARGE = "charge"
+ACTION_IDLE = "idle"
+ACTION_DISCHARGE = "discharge"
+ACTIONS = [ACTION_CHARGE, ACTION_IDLE, ACTION_DISCHARGE]
+
+
+def battery_from_config(data: Mapping[str, Any]) -> Battery | None:
+    """Return the battery configured on an entry, if any."""
+    capacity = data.get(CONF_BATTERY_CAPACITY, DEFAULT_BATTERY_CAPACITY)
+    if not capacity:
+        return None
+    return Battery(
+        capacity_kwh=float(capacity),
+        charge_kw=float(data.get(CONF_BATTERY_CHARGE_POWER, DEFAULT_BATTERY_POWER)),
+        discharge_kw=float(data.get(CONF_BATTERY_DISCHARGE_POWER, DEFAULT_BATTERY_POWER)),
+        efficiency=data.get(CONF_BATTERY_EFFICIENCY, DEFAULT_BATTERY_EFFICIENCY) / 100,
+    )
+
+
+def action(power: float) -> str:
+    """Return the action label of a planned grid-side power."""
+    if power > 0:
+        return ACTION_CHARGE
+    if power < 0:
+        return ACTION_DISCHARGE
+    return ACTION_IDLE
+
+
+async def async_plan_battery(
+    hass: HomeAssistant,
+    snapshot: PriceSnapshot,
+    battery: Battery,
+    soc_percent: float,
+    now: datetime,
+) -> tuple[PriceSeries, int, BatteryPlan] | None:
+    """Plan a battery over the forecast from the slot covering ``now``.
+
+    The solve runs in the executor. The pending result is memoized on the
+    snapshot, so concurrent callers share one solve and the plan is reused
+    until the forecast, the current slot or the state of charge changes.
+    A failed solve is dropped from the memo.
+    """
+    series = snapshot.forecast_7d or snapshot.forecast_24h
+    start, end = series.upcoming_range(now, 7 * 24)
+    if start >= end:
+        return None
+
+    step_hours = series.step / 3600
+    levels = battery_levels(battery, step_hours)
+    initial_level = round(max(0.0, min(100.0, soc_percent)) / 100 * levels)
+    key = ("battery", series is snapshot.forecast_7d, start, end, battery, initial_level)
+    try:
+        plan = await snapshot.cached(
+            key,
+            lambda: hass.async_add_executor_job(
+                battery_schedule,
+                series.prices[start:end],
+                step_hours,
+                battery,
+                initial_level,
+                levels,
+            ),
+        )
+    except BaseException:
+        # Only successful solves are kept; the next update tries again
+        snapshot.discard(key)
+        raise
+    return series, start, plan
+
+
+def plan_as_list(series: PriceSeries, start: int, plan: BatteryPlan) -> list[dict[str, Any]]:
+    """Return a plan as JSON-serializable rows per slot."""
+    return [
+        {
+            "time": series.times[start + offset],
+            "action": action(power),
+            "power_kw": round(power, 2),
+            "soc_kwh": round(soc, 2),
+            "price": round(series.prices[start + offset] / 1000, 5),
+        }
+        for offset, (power, soc) in enumerate(zip(plan.power, plan.soc))
+    ]
@@ -1,9 +1,6 @@
 """Binary sensor platform for Electricity Price Forecast."""
 from __future__ import annotations
 
-from datetime import datetime, timedelta
-from typing import Any
-
 from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
     BinarySensorEntity,
@@ -14,6 +11,7 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import dt as dt_util
 
+from .charging import ChargingPlanner
 from .const import DOMAIN
 
 
@@ -25,6 +23,7 @@ async def async_setup_entry(
     """Set up the binary sensor platform."""
     coordinator = hass.data[DOMAIN][config_entry.entry_id]["coordinator"]
     api = hass.data[DOMAIN][config_entry.entry_id]["api"]
+    planner = hass.data[DOMAIN][config_entry.entry_id]["charging"]
 
     binary_sensors = [
         IsCheapNowBinarySensor(coordinator, api),
@@ -33,6 +32,7 @@ async def async_setup_entry(
         IsInCheapest6HoursBinarySensor(coordinator, api),
         IsBelowAverageBinarySensor(coordinator, api),
         TomorrowCheaperBinarySensor(coordinator, api),
+        EVChargingPlannedBinarySensor(coordinator, api, planner),
     ]
 
     async_add_entities(binary_sensors)
@@ -75,25 +75,15 @@ class IsCheapNowBinarySensor(ElectricityPriceBinarySensorBase):
         if not self.coordinator.data:
             return False
 
-        current = self.coordinator.data.get("current_price")
-        predictions = self.coordinator.data.get("predictions_24h", [])
-
-        if not current or not predictions:
-            return False
-
         now = dt_util.now()
-        today_end = now.replace(hour=23, minute=59, second=59)
-        today_prices = [
-            p["predicted_price"] for p in predictions
-            if now <= datetime.fromisoformat(p["timestamp"].replace("Z", "+00:00")) <= today_end
-        ]
+        current_price = self.coordinator.data.current_price_at(now)
+        today = self.coordinator.data.today_index(now)
 
-        if not today_prices:
+        if current_price is None or today is None:
             return False
 
-        current_price = current["price"]
-        min_price = min(today_prices)
-        max_price = max(today_prices)
+        min_price = today.min
+        max_price = today.max
         cheap_threshold = min_price + (max_price - min_price) * 0.25
 
         return current_price <= cheap_threshold
@@ -104,23 +94,13 @@ class IsCheapNowBinarySensor(ElectricityPriceBinarySensorBase):
         if not self.coordinator.data:
             return {}
 
-        current = self.coordinator.data.get("current_price")
-        predictions = self.coordinator.data.get("predictions_24h", [])
-
-        if not current or not predictions:
-            return {}
-
         now = dt_util.now()
-        today_end = now.replace(hour=23, minute=59, second=59)
-        today_prices = [
-            p["predicted_price"] for p in predictions
-            if now <= datetime.fromisoformat(p["timestamp"].replace("Z", "+00:00")) <= today_end
-        ]
-
-        if today_prices:
-            current_price = current["price"]
-            min_price = min(today_prices)
-            max_price = max(today_prices)
+        current_price = self.coordinator.data.current_price_at(now)
+        today = self.coordinator.data.today_index(now)
+
+        if current_price is not None and today is not None:
+            min_price = today.min
+            max_price = today.max
             cheap_threshold = min_price + (max_price - min_price) * 0.25
 
             return {
@@ -149,25 +129,15 @@ class IsExpensiveNowBinarySensor(ElectricityPriceBinarySensorBase):
         if not self.coordinator.data:
             return False
 
-        current = self.coordinator.data.get("current_price")
-        predictions = self.coordinator.data.get("predictions_24h", [])
-
-        if not current or not predictions:
-            return False
-
         now = dt_util.now()
-        today_end = now.replace(hour=23, minute=59, second=59)
-        today_prices = [
-            p["predicted_price"] for p in predictions
-            if now <= datetime.fromisoformat(p["timestamp"].replace("Z", "+00:00")) <= today_end
-        ]
+        current_price = self.coordinator.data.current_price_at(now)
+        today = self.coordinator.data.today_index(now)
 
-        if not today_prices:
+        if current_price is None or today is None:
             return False
 
-        current_price = current["price"]
-        min_price = min(today_prices)
-        max_price = max(today_prices)
+        min_price = today.min
+        max_price = today.max
         expensive_threshold = min_price + (max_price - min_price) * 0.75
 
         return current_price >= expensive_threshold
@@ -178,23 +148,13 @@ class IsExpensiveNowBinarySensor(ElectricityPriceBinarySensorBase):
         if not self.coordinator.data:
             return {}
 
-        current = self.coordinator.data.get("current_price")
-        predictions = self.coordinator.data.get("predictions_24h", [])
-
-        if not current or not predictions:
-            return {}
-
         now = dt_util.now()
-        today_end = now.replace(hour=23, minute=59, second=59)
-        today_prices = [
-            p["predicted_price"] for p in predictions
-            if now <= datetime.fromisoformat(p["timestamp"].replace("Z", "+00:00")) <= today_end
-        ]
-
-        if today_prices:
-            current_price = current["price"]
-            min_price = min(today_prices)
-            max_price = max(today_prices)
+        current_price = self.coordinator.data.current_price_at(now)
+        today = self.coordinator.data.today_index(now)
+
+        if current_price is not None and today is not None:
+            min_price = today.min
+            max_price = today.max
             expensive_threshold = min_price + (max_price - min_price) * 0.75
 
             return {
@@ -223,26 +183,14 @@ class IsInCheapest3HoursBinarySensor(ElectricityPriceBinarySensorBase):
         if not self.coordinator.data:
             return False
 
-        current = self.coordinator.data.get("current_price")
-        predictions = self.coordinator.data.get("predictions_24h", [])
-
-        if not current or not predictions:
-            return False
-
         now = dt_util.now()
-        today_end = now.replace(hour=23, minute=59, second=59)
-        today_prices = [
-            p["predicted_price"] for p in predictions
-            if now <= datetime.fromisoformat(p["timestamp"].replace("Z", "+00:00")) <= today_end
-        ]
+        current_price = self.coordinator.data.current_price_at(now)
+        today = self.coordinator.data.today_index(now)
 
-        if not today_prices:
+        if current_price is None or today is None:
             return False
 
-        current_price = current["price"]
-        rank = sum(1 for p in today_prices if p < current_price) + 1
-
-        return rank <= 3
+        return today.is_in_cheapest(current_price, 3)
 
     @property
     def extra_state_attributes(self):
@@ -250,26 +198,16 @@ class IsInCheapest3HoursBinarySensor(ElectricityPriceBinarySensorBase):
         if not self.coordinator.data:
             return {}
 
-        current = self.coordinator.data.get("current_price")
-        predictions = self.coordinator.data.get("predictions_24h", [])
-
-        if not current or not predictions:
-            return {}
-
         now = dt_util.now()
-        today_end = now.replace(hour=23, minute=59, second=59)
-        today_prices = [
-            p["predicted_price"] for p in predictions
-            if now <= datetime.fromisoformat(p["timestamp"].replace("Z", "+00:00")) <= today_end
-        ]
+        current_price = self.coordinator.data.current_price_at(now)
+        today = self.coordinator.data.today_index(now)
 
-        if today_prices:
-            current_price = current["price"]
-            rank = sum(1 for p in today_prices if p < current_price) + 1
+        if current_price is not None and today is not None:
+            rank = today.rank(current_price)
 
             return {
                 "rank": rank,
-                "total_hours": len(today_prices),
+                "total_hours": len(today),
                 "current_price": round(current_price / 1000, 5),
             }
         return {}
@@ -292,26 +230,14 @@ class IsInCheapest6HoursBinarySensor(ElectricityPriceBinarySensorBase):
         if not self.coordinator.data:
             return False
 
-        current = self.coordinator.data.get("current_price")
-        predictions = self.coordinator.data.get("predictions_24h", [])
-
-        if not current or not predictions:
-            return False
-
         now = dt_util.now()
-        today_end = now.replace(hour=23, minute=59, second=59)
-        today_prices = [
-            p["predicted_price"] for p in predictions
-            if now <= datetime.fromisoformat(p["timestamp"].replace("Z", "+00:00")) <= today_end
-        ]
+        current_price = self.coordinator.data.current_price_at(now)
+        today = self.coordinator.data.today_index(now)
 
-        if not today_prices:
+        if current_price is None or today is None:
             return False
 
-        current_price = current["price"]
-        rank = sum(1 for p in today_prices if p < current_price) + 1
-
-        return rank <= 6
+        return today.is_in_cheapest(current_price, 6)
 
     @property
     def extra_state_attributes(self):
@@ -319,26 +245,16 @@ class IsInCheapest6HoursBinarySensor(ElectricityPriceBinarySensorBase):
         if not self.coordinator.data:
             return {}
 
-        current = self.coordinator.data.get("current_price")
-        predictions = self.coordinator.data.get("predictions_24h", [])
-
-        if not current or not predictions:
-            return {}
-
         now = dt_util.now()
-        today_end = now.replace(hour=23, minute=59, second=59)
-        today_prices = [
-            p["predicted_price"] for p in predictions
-            if now <= datetime.fromisoformat(p["timestamp"].replace("Z", "+00:00")) <= today_end
-        ]
+        current_price = self.coordinator.data.current_price_at(now)
+        today = self.coordinator.data.today_index(now)
 
-        if today_prices:
-            current_price = current["price"]
-            rank = sum(1 for p in today_prices if p < current_price) + 1
+        if current_price is not None and today is not None:
+            rank = today.rank(current_price)
 
             return {
                 "rank": rank,
-                "total_hours": len(today_prices),
+                "total_hours": len(today),
                 "current_price": round(current_price / 1000, 5),
             }
         return {}
@@ -361,24 +277,14 @@ class IsBelowAverageBinarySensor(ElectricityPriceBinarySensorBase):
         if not self.coordinator.data:
             return False
 
-        current = self.coordinator.data.get("current_price")
-        predictions = self.coordinator.data.get("predictions_24h", [])
-
-        if not current or not predictions:
-            return False
-
         now = dt_util.now()
-        today_end = now.replace(hour=23, minute=59, second=59)
-        today_prices = [
-            p["predicted_price"] for p in predictions
-            if now <= datetime.fromisoformat(p["timestamp"].replace("Z", "+00:00")) <= today_end
-        ]
+        current_price = self.coordinator.data.current_price_at(now)
+        today = self.coordinator.data.today_index(now)
 
-        if not today_prices:
+        if current_price is None or today is None:
             return False
 
-        current_price = current["price"]
-        avg_price = sum(today_prices) / len(today_prices)
+        avg_price = today.average
 
         return current_price < avg_price
 
@@ -388,22 +294,12 @@ class IsBelowAverageBinarySensor(ElectricityPriceBinarySensorBase):
         if not self.coordinator.data:
             return {}
 
-        current = self.coordinator.data.get("current_price")
-        predictions = self.coordinator.data.get("predictions_24h", [])
-
-        if not current or not predictions:
-            return {}
-
         now = dt_util.now()
-        today_end = now.replace(hour=23, minute=59, second=59)
-        today_prices = [
-            p["predicted_price"] for p in predictions
-            if now <= datetime.fromisoformat(p["timestamp"].replace("Z", "+00:00")) <= today_end
-        ]
+        current_price = self.coordinator.data.current_price_at(now)
+        today = self.coordinator.data.today_index(now)
 
-        if today_prices:
-            current_price = current["price"]
-            avg_price = sum(today_prices) / len(today_prices)
+        if current_price is not None and today is not None:
+            avg_price = today.average
 
             return {
                 "current_price": round(current_price / 1000, 5),
@@ -431,32 +327,11 @@ class TomorrowCheaperBinarySensor(ElectricityPriceBinarySensorBase):
         if not self.coordinator.data:
             return False
 
-        predictions_24h = self.coordinator.data.get("predictions_24h", [])
-        predictions_7d = self.coordinator.data.get("predictions_7d", [])
-
-        if not predictions_24h or not predictions_7d:
+        averages = self.coordinator.data.daily_comparison(dt_util.now())
+        if averages is None:
             return False
 
-        today = dt_util.now().date()
-        tomorrow = (dt_util.now() + timedelta(days=1)).date()
-
-        # Calculate today's average
-        today_prices = [
-            p["predicted_price"] for p in predictions_24h
-            if datetime.fromisoformat(p["timestamp"].replace("Z", "+00:00")).date() == today
-        ]
-
-        # Calculate tomorrow's average
-        tomorrow_prices = [
-            p["predicted_price"] for p in predictions_7d
-            if datetime.fromisoformat(p["timestamp"].replace("Z", "+00:00")).date() == tomorrow
-        ]
-
-        if not today_prices or not tomorrow_prices:
-            return False
-
-        today_avg = sum(today_prices) / len(today_prices)
-        tomorrow_avg = sum(tomorrow_prices) / len(tomorrow_prices)
+        today_avg, tomorrow_avg = averages
 
         # Tomorrow is cheaper by at least 10%
         return tomorrow_avg < today_avg * 0.9
@@ -467,30 +342,11 @@ class TomorrowCheaperBinarySensor(ElectricityPriceBinarySensorBase):
         if not self.coordinator.data:
             return {}
 
-        predictions_24h = self.coordinator.data.get("predictions_24h", [])
-        predictions_7d = self.coordinator.data.get("predictions_7d", [])
-
-        if not predictions_24h or not predictions_7d:
+        averages = self.coordinator.data.daily_comparison(dt_util.now())
+        if averages is None:
             return {}
 
-        today = dt_util.now().date()
-        tomorrow = (dt_util.now() + timedelta(days=1)).date()
-
-        today_prices = [
-            p["predicted_price"] for p in predictions_24h
-            if datetime.fromisoformat(p["timestamp"].replace("Z", "+00:00")).date() == today
-        ]
-
-        tomorrow_prices = [
-            p["predicted_price"] for p in predictions_7d
-            if datetime.fromisoformat(p["timestamp"].replace("Z", "+00:00")).date() == tomorrow
-        ]
-
-        if not today_prices or not tomorrow_prices:
-            return {}
-
-        today_avg = sum(today_prices) / len(today_prices)
-        tomorrow_avg = sum(tomorrow_prices) / len(tomorrow_prices)
+        today_avg, tomorrow_avg = averages
         savings_percent = ((today_avg - tomorrow_avg) / today_avg) * 100
 
         return {
@@ -499,3 +355,49 @@ class TomorrowCheaperBinarySensor(ElectricityPriceBinarySensorBase):
             "savings_percent": round(savings_percent, 1),
             "recommendation": "Delay energy-intensive tasks until tomorrow" if savings_percent > 10 else "No significant savings",
         }
+
+
+class EVChargingPlannedBinarySensor(ElectricityPriceBinarySensorBase):
+    """Binary sensor that is on during slots planned by plan_ev_charging."""
+
+    _attr_name = "EV Charging Planned"
+    _attr_icon = "mdi:ev-station"
+    _unrecorded_attributes = frozenset({"slots"})
+
+    def __init__(self, coordinator, api, planner: ChargingPlanner):
+        """Initialize the binary sensor."""
+        super().__init__(coordinator, api)
+        self.planner = planner
+
+    @property
+    def unique_id(self):
+        """Return unique ID."""
+        return f"{self.api.region_id}_ev_charging_planned"
+
+    async def async_added_to_hass(self) -> None:
+        """Follow plan changes."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self.planner.async_add_listener(self.async_write_ha_state))
+
+    @property
+    def is_on(self):
+        """Return true if charging is planned for the current slot."""
+        plan = self.planner.plan
+        return plan is not None and plan.slot_at(dt_util.utcnow().timestamp()) is not None
+
+    @property
+    def extra_state_attributes(self):
+        """Return additional attributes."""
+        plan = self.planner.plan
+        if plan is None:
+            return {}
+
+        now = dt_util.utcnow().timestamp()
+        current = plan.slot_at(now)
+        upcoming = [slot for slot in plan.slots if slot.start > now]
+        attributes = plan.as_dict()
+        attributes["power_kw"] = round(current.power_kw, 2) if current else 0
+        attributes["next_start"] = (
+            dt_util.utc_from_timestamp(upcoming[0].start).isoformat() if upcoming else None
+        )
+        return attributes
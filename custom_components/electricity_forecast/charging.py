@@ -0,0 +1,205 @@
+"""EV charging planner for Electricity Price Forecast."""
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from typing import Any, NamedTuple
+
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.util import dt as dt_util
+
+from .optimize import cheapest_slots
+from .snapshot import PriceSeries, PriceSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ChargeRequest(NamedTuple):
+    """Energy to charge between two epochs at up to a given power."""
+
+    energy_kwh: float
+    max_power_kw: float
+    earliest: float
+    deadline: float
+
+
+class ChargeSlot(NamedTuple):
+    """One planned charging slot (epochs, kW and €/MWh)."""
+
+    start: float
+    end: float
+    power_kw: float
+    price: float
+
+    @property
+    def energy_kwh(self) -> float:
+        """Return the energy charged in the slot."""
+        return self.power_kw * (self.end - self.start) / 3600
+
+    @property
+    def cost(self) -> float:
+        """Return the cost of the slot in the price currency."""
+        return self.energy_kwh * self.price / 1000
+
+
+class ChargePlan(NamedTuple):
+    """Planned slots for a charge request."""
+
+    request: ChargeRequest
+    slots: tuple[ChargeSlot, ...]
+    # Window prices (slot start -> €/MWh) the plan was made with
+    prices: dict[float, float]
+
+    @property
+    def energy_kwh(self) -> float:
+        """Return the planned energy."""
+        return sum(slot.energy_kwh for slot in self.slots)
+
+    @property
+    def shortfall_kwh(self) -> float:
+        """Return the requested energy that does not fit before the deadline."""
+        return max(0.0, self.request.energy_kwh - self.energy_kwh)
+
+    @property
+    def cost(self) -> float:
+        """Return the cost of the plan."""
+        return sum(slot.cost for slot in self.slots)
+
+    def slot_at(self, epoch: float) -> ChargeSlot | None:
+        """Return the planned slot covering ``epoch``."""
+        for slot in self.slots:
+            if slot.start <= epoch < slot.end:
+                return slot
+        return None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a JSON-serializable representation."""
+        return {
+            "energy_kwh": round(self.energy_kwh, 2),
+            "shortfall_kwh": round(self.shortfall_kwh, 2),
+            "cost": round(self.cost, 4),
+            "deadline": dt_util.utc_from_timestamp(self.request.deadline).isoformat(),
+            "slots": [
+                {
+                    "start": dt_util.utc_from_timestamp(slot.start).isoformat(),
+                    "end": dt_util.utc_from_timestamp(slot.end).isoformat(),
+                    "power_kw": round(slot.power_kw, 2),
+                    "price": round(slot.price / 1000, 5),
+                }
+                for slot in self.slots
+            ],
+        }
+
+
+def _window_prices(series: PriceSeries, start: int, end: int) -> dict[float, float]:
+    """Return the prices of a window by slot start."""
+    return dict(zip(series.timestamps[start:end], series.prices[start:end]))
+
+
+def _upcoming(prices: dict[float, float], now: float) -> dict[float, float]:
+    """Return the window prices of slots that have not started yet."""
+    return {slot_start: price for slot_start, price in prices.items() if slot_start > now}
+
+
+def plan_charging(
+    series: PriceSeries,
+    request: ChargeRequest,
+    now: float,
+    fixed: tuple[ChargeSlot, ...] = (),
+) -> ChargePlan:
+    """Plan the cheapest slots for a request, keeping already started ones.
+
+    The slot running at the earliest start (or now) is usable for the rest
+    of its length unless it is already among the fixed slots.
+    """
+    start, end = series.window_range(request.earliest, request.deadline)
+    begin = max(request.earliest, now, *(slot.end for slot in fixed))
+    first = series.slot_at(begin)
+    if first is None:
+        first = max(start, series.next_index(begin))
+    first_share = 1.0
+    if first < len(series.timestamps) and series.timestamps[first] < begin:
+        first_share = (series.timestamps[first] + series.step - begin) / series.step
+    prices = _window_prices(series, min(first, start), end)
+
+    remaining = request.energy_kwh - sum(slot.energy_kwh for slot in fixed)
+    slot_energy = request.max_power_kw * series.step / 3600
+    planned = []
+    for index, share in cheapest_slots(
+        series.prices, series.order, first, end, slot_energy, remaining, first_share
+    ):
+        available = first_share if index == first else 1.0
+        planned.append(
+            ChargeSlot(
+                max(series.timestamps[index], begin),
+                series.timestamps[index] + series.step,
+                request.max_power_kw * share / available,
+                series.prices[index],
+            )
+        )
+    return ChargePlan(request, fixed + tuple(planned), prices)
+
+
+class ChargingPlanner:
+    """Active charge request of a region and its plan.
+
+    On every forecast update the plan is checked against the new prices of
+    the remaining window. Slots that already started are kept; when any
+    upcoming price changed, the rest of the window is planned again from
+    scratch.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the planner."""
+        self.plan: ChargePlan | None = None
+        self._listeners: list[CALLBACK_TYPE] = []
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> Callable[[], None]:
+        """Listen for plan changes."""
+        self._listeners.append(update_callback)
+        return lambda: self._listeners.remove(update_callback)
+
+    @callback
+    def _async_notify(self) -> None:
+        """Notify listeners of a changed plan."""
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    @callback
+    def async_set_request(self, snapshot: PriceSnapshot, request: ChargeRequest) -> ChargePlan:
+        """Plan a new charge request, replacing the active one."""
+        series = snapshot.planning_series(request.deadline)
+        self.plan = plan_charging(series, request, dt_util.utcnow().timestamp())
+        self._async_notify()
+        return self.plan
+
+    @callback
+    def async_cancel(self) -> None:
+        """Drop the active charge request."""
+        self.plan = None
+        self._async_notify()
+
+    @callback
+    def async_update(self, snapshot: PriceSnapshot | None) -> None:
+        """Re-plan the remaining window when its prices changed."""
+        if self.plan is None or snapshot is None:
+            return
+
+        now = dt_util.utcnow().timestamp()
+        request = self.plan.request
+        if now >= request.deadline:
+            self.plan = None
+            self._async_notify()
+            return
+
+        series = snapshot.planning_series(request.deadline)
+        start, end = series.window_range(request.earliest, request.deadline)
+        prices = _window_prices(series, start, end)
+        if _upcoming(prices, now) == _upcoming(self.plan.prices, now):
+            return
+
+        fixed = tuple(slot for slot in self.plan.slots if slot.start <= now)
+        _LOGGER.debug("Forecast changed within the charging window, re-planning")
+        self.plan = plan_charging(series, request, now, fixed)
+        self._async_notify()
@@ -5,16 +5,35 @@ import logging
 from typing import Any
 from urllib.parse import urlparse
 
-import aiohttp
 import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_URL
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers import selector
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
-from .const import CONF_API_URL, CONF_REGION_ID, DEFAULT_API_URL, DEFAULT_REGION_ID, DOMAIN, REGIONS
+from .api import ElectricityForecastAPI
+from .const import (
+    CONF_API_URL,
+    CONF_BATTERY_CAPACITY,
+    CONF_BATTERY_CHARGE_POWER,
+    CONF_BATTERY_DISCHARGE_POWER,
+    CONF_BATTERY_EFFICIENCY,
+    CONF_BATTERY_SOC_ENTITY,
+    CONF_MAX_STALENESS,
+    CONF_REGION_ID,
+    DEFAULT_API_URL,
+    DEFAULT_BATTERY_CAPACITY,
+    DEFAULT_BATTERY_EFFICIENCY,
+    DEFAULT_BATTERY_POWER,
+    DEFAULT_MAX_STALENESS,
+    DEFAULT_REGION_ID,
+    DATA_HUBS,
+    DOMAIN,
+    REGIONS,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -29,33 +48,35 @@ def validate_url(url: str) -> bool:
 
 
 async def validate_api(hass: HomeAssistant, api_url: str, region_id: str) -> dict[str, Any]:
-    """Validate the API connection."""
-    session = async_get_clientsession(hass)
+    """Validate the API connection.
+
+    Each check is a single attempt with its own circuit breaker, so a bad
+    URL fails fast and does not count against entries using the backend.
+    When entries already use it, the request gate of their hub is shared so
+    requests in flight and the concurrency limit are shared with them.
+    """
+    hub = hass.data.get(DOMAIN, {}).get(DATA_HUBS, {}).get(api_url)
+    api = ElectricityForecastAPI(
+        api_url,
+        async_get_clientsession(hass),
+        region_id,
+        gate=hub.gate if hub else None,
+        retries=0,
+    )
 
     try:
         # Test health endpoint
-        timeout = aiohttp.ClientTimeout(total=30)
-        async with session.get(f"{api_url}/health", timeout=timeout) as response:
-            if response.status != 200:
-                raise Exception("API health check failed")
+        await api.async_check_health()
 
         # Test predictions endpoint
-        async with session.get(
-            f"{api_url}/api/predictions/{region_id}/next-24h", timeout=timeout
-        ) as response:
-            if response.status != 200:
-                raise Exception(f"Cannot fetch predictions for region {region_id}")
-            data = await response.json()
-            if not data or not isinstance(data, list):
-                raise Exception("No prediction data available or invalid format")
+        data = await api.async_get_predictions(24)
+        if not data.timestamps:
+            raise Exception("No prediction data available")
 
         return {"title": f"Electricity Forecast ({region_id})"}
 
-    except aiohttp.ClientError as err:
-        _LOGGER.error("Error connecting to API: %s", err)
-        raise Exception("Cannot connect to API") from err
     except Exception as err:
-        _LOGGER.error("Unexpected error: %s", err)
+        _LOGGER.error("Error connecting to API: %s", err)
         raise
 
 
@@ -171,10 +192,37 @@ class ElectricityForecastOptionsFlow(config_entries.OptionsFlow):
         current_api_url = self.config_entry.data.get(CONF_API_URL, DEFAULT_API_URL)
         current_region = self.config_entry.data.get(CONF_REGION_ID, DEFAULT_REGION_ID)
 
+        data = self.config_entry.data
+        soc_entity = data.get(CONF_BATTERY_SOC_ENTITY)
+
         data_schema = vol.Schema(
             {
                 vol.Required(CONF_API_URL, default=current_api_url): str,
                 vol.Required(CONF_REGION_ID, default=current_region): vol.In(REGIONS),
+                vol.Optional(
+                    CONF_MAX_STALENESS,
+                    default=data.get(CONF_MAX_STALENESS, DEFAULT_MAX_STALENESS),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=48)),
+                vol.Optional(
+                    CONF_BATTERY_CAPACITY,
+                    default=data.get(CONF_BATTERY_CAPACITY, DEFAULT_BATTERY_CAPACITY),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=1000)),
+                vol.Optional(
+                    CONF_BATTERY_CHARGE_POWER,
+                    default=data.get(CONF_BATTERY_CHARGE_POWER, DEFAULT_BATTERY_POWER),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0.1, max=1000)),
+                vol.Optional(
+                    CONF_BATTERY_DISCHARGE_POWER,
+                    default=data.get(CONF_BATTERY_DISCHARGE_POWER, DEFAULT_BATTERY_POWER),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0.1, max=1000)),
+                vol.Optional(
+                    CONF_BATTERY_EFFICIENCY,
+                    default=data.get(CONF_BATTERY_EFFICIENCY, DEFAULT_BATTERY_EFFICIENCY),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=100)),
+                vol.Optional(
+                    CONF_BATTERY_SOC_ENTITY,
+                    description={"suggested_value": soc_entity} if soc_entity else None,
+                ): selector.EntitySelector(selector.EntitySelectorConfig(domain="sensor")),
             }
         )
 
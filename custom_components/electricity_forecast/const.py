@@ -2,13 +2,33 @@
 
 DOMAIN = "electricity_forecast"
 
+# hass.data[DOMAIN] key holding the shared fetch hubs by API URL
+DATA_HUBS = "hubs"
+
 # Configuration
 CONF_API_URL = "api_url"
 CONF_REGION_ID = "region_id"
+CONF_BATTERY_CAPACITY = "battery_capacity"
+CONF_BATTERY_CHARGE_POWER = "battery_charge_power"
+CONF_BATTERY_DISCHARGE_POWER = "battery_discharge_power"
+CONF_BATTERY_EFFICIENCY = "battery_efficiency"
+CONF_BATTERY_SOC_ENTITY = "battery_soc_entity"
+CONF_MAX_STALENESS = "max_staleness"
 
 # Default values
 DEFAULT_API_URL = "http://localhost:8000"
 DEFAULT_REGION_ID = "DE"
+# A capacity of 0 means no battery is configured
+DEFAULT_BATTERY_CAPACITY = 0.0
+DEFAULT_BATTERY_POWER = 5.0
+DEFAULT_BATTERY_EFFICIENCY = 90
+DEFAULT_BATTERY_SOC = 50
+# Hours the last good data is served while the backend fails
+DEFAULT_MAX_STALENESS = 6
+# Three-phase 16 A wallbox
+DEFAULT_EV_CHARGE_POWER = 11.0
+# Seconds the joint load scheduler may search
+DEFAULT_SCHEDULE_TIME_LIMIT = 2.0
 
 # Available regions
 REGIONS = {
@@ -25,6 +45,48 @@ REGIONS = {
 # Services
 SERVICE_GET_CHEAPEST_HOURS = "get_cheapest_hours"
 SERVICE_GET_EXPENSIVE_HOURS = "get_expensive_hours"
+SERVICE_GET_FORECAST = "get_forecast"
+SERVICE_FIND_CHEAPEST_WINDOW = "find_cheapest_window"
+SERVICE_OPTIMIZE_LOAD_PROFILE = "optimize_load_profile"
+SERVICE_OPTIMIZE_BATTERY = "optimize_battery"
+SERVICE_PLAN_EV_CHARGING = "plan_ev_charging"
+SERVICE_CANCEL_EV_CHARGING = "cancel_ev_charging"
+SERVICE_SCHEDULE_LOADS = "schedule_loads"
+SERVICE_PROFILE_REFRESH = "profile_refresh"
+
+# Service fields
+ATTR_REGION = "region"
+ATTR_HORIZON = "horizon"
+ATTR_HORIZON_HOURS = "horizon_hours"
+ATTR_HOURS = "hours"
+ATTR_DURATIONS = "durations"
+ATTR_EARLIEST_START = "earliest_start"
+ATTR_DEADLINE = "deadline"
+ATTR_PROFILE = "profile"
+ATTR_PROFILE_STEP = "profile_step_minutes"
+ATTR_ALTERNATIVES = "alternatives"
+ATTR_CAPACITY = "capacity_kwh"
+ATTR_CHARGE_POWER = "charge_power_kw"
+ATTR_DISCHARGE_POWER = "discharge_power_kw"
+ATTR_EFFICIENCY = "efficiency"
+ATTR_STATE_OF_CHARGE = "state_of_charge"
+ATTR_ENERGY = "energy_kwh"
+ATTR_MAX_POWER = "max_power_kw"
+ATTR_LOADS = "loads"
+ATTR_DURATION = "duration_hours"
+ATTR_POWER = "power_kw"
+ATTR_SITE_LIMIT = "site_limit_kw"
+ATTR_TIME_LIMIT = "time_limit"
+ATTR_TOP = "top"
+
+# Forecast horizons
+HORIZON_24H = "24h"
+HORIZON_7D = "7d"
+HORIZON_TODAY = "today"
+HORIZON_NEXT_HOURS = "next_hours"
+
+# Window lengths (hours) with a "cheapest window" sensor
+WINDOW_SENSOR_HOURS = (2, 3, 4)
 
 # Attributes
 ATTR_FORECAST_24H = "forecast_24h"
@@ -0,0 +1,163 @@
+"""Data update coordinator for Electricity Price Forecast."""
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Callable
+from datetime import datetime
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_change
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .api import ElectricityForecastAPI
+from .const import DOMAIN
+from .metrics import RefreshMetrics
+from .snapshot import PriceSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+# Batch writes of the warm-start cache, in seconds
+STORAGE_SAVE_DELAY = 60
+
+# Minutes past the hour at which entities re-evaluate the cached snapshot
+CLOCK_UPDATE_MINUTES = (0, 15, 30, 45)
+
+
+def storage_key(entry_id: str) -> str:
+    """Return the storage key of a config entry's snapshot cache."""
+    return f"{DOMAIN}.{entry_id}"
+
+
+class ElectricityForecastCoordinator(DataUpdateCoordinator[PriceSnapshot]):
+    """Fetch forecasts for one region and keep the last good snapshot on disk."""
+
+    def __init__(
+        self, hass: HomeAssistant, entry: ConfigEntry, api: ElectricityForecastAPI
+    ) -> None:
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            # Refreshes are scheduled by the shared hub
+            update_interval=None,
+            # Snapshots compare by value; skip entity updates when nothing changed
+            always_update=False,
+        )
+        self.api = api
+        self.metrics = RefreshMetrics()
+        self._metrics_listeners: list[CALLBACK_TYPE] = []
+        self._store: Store[dict] = Store(hass, STORAGE_VERSION, storage_key(entry.entry_id))
+
+    async def async_load_cache(self) -> bool:
+        """Restore the last stored snapshot, returning whether one was found."""
+        try:
+            stored = await self._store.async_load()
+            if not stored:
+                return False
+            # The region or backend may have been changed in the options
+            if (stored.get("region_id"), stored.get("api_url")) != (
+                self.api.region_id,
+                self.api.api_url,
+            ):
+                _LOGGER.debug("Discarding cached forecast of another region or backend")
+                return False
+            snapshot = PriceSnapshot.from_dict(stored)
+        except Exception as err:
+            _LOGGER.warning("Ignoring invalid cached forecast for %s: %s", self.api.region_id, err)
+            return False
+
+        _LOGGER.debug(
+            "Restored cached forecast for %s (%.0f minutes old)",
+            self.api.region_id,
+            snapshot.age / 60,
+        )
+        self.async_set_updated_data(snapshot)
+        return True
+
+    @callback
+    def async_track_clock(self) -> CALLBACK_TYPE:
+        """Re-evaluate entities on quarter-hour boundaries without fetching.
+
+        Current price, rankings and next-hour values depend on the time of
+        day, so entities are updated from the cached snapshot when a slot
+        starts rather than waiting for the next refresh.
+        """
+        return async_track_time_change(
+            self.hass, self._async_handle_clock, minute=CLOCK_UPDATE_MINUTES, second=0
+        )
+
+    @callback
+    def async_add_metrics_listener(self, update_callback: CALLBACK_TYPE) -> Callable[[], None]:
+        """Listen for new metrics after every refresh, changed data or not."""
+        self._metrics_listeners.append(update_callback)
+        return lambda: self._metrics_listeners.remove(update_callback)
+
+    async def async_refresh(self) -> None:
+        """Refresh data and notify metrics listeners."""
+        await super().async_refresh()
+        for update_callback in list(self._metrics_listeners):
+            update_callback()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all entities, timing the fan-out."""
+        started = time.perf_counter()
+        super().async_update_listeners()
+        self.metrics.fan_out.add(time.perf_counter() - started)
+
+    @callback
+    def _async_handle_clock(self, now: datetime) -> None:
+        """Push the cached snapshot to entities at a slot boundary."""
+        if self.data is not None:
+            self.async_update_listeners()
+
+    async def _async_update_data(self) -> PriceSnapshot:
+        """Fetch data from API."""
+        started = time.perf_counter()
+        try:
+            _LOGGER.debug("Fetching data from API: %s", self.api.api_url)
+            data = await self.api.async_get_all_data()
+            fetched = time.perf_counter()
+            _LOGGER.debug(
+                "Successfully fetched data for region %s (%s)",
+                self.api.region_id,
+                ", ".join(f"{name}: {seconds:.3f}s" for name, seconds in data["timings"].items()),
+            )
+            snapshot = PriceSnapshot.from_api_data(data)
+        except Exception as err:
+            self.metrics.record_failure(err)
+            # Keep entities on the last good data until it is too old
+            if self.data is not None and self.data.age <= self.api.max_staleness:
+                _LOGGER.warning(
+                    "Error communicating with API %s, keeping data from %.0f minutes ago: %s",
+                    self.api.api_url,
+                    self.data.age / 60,
+                    err,
+                )
+                return self.data
+            _LOGGER.error("Error communicating with API %s: %s", self.api.api_url, err)
+            raise UpdateFailed(f"Error communicating with API: {err}")
+
+        finished = time.perf_counter()
+        self.metrics.record_refresh(finished - started, finished - fetched)
+
+        # Keep schedules solved for unchanged forecasts
+        snapshot.adopt_results(self.data)
+        self._store.async_delay_save(
+            lambda: self._cache_data(snapshot), STORAGE_SAVE_DELAY
+        )
+        return snapshot
+
+    def _cache_data(self, snapshot: PriceSnapshot) -> dict:
+        """Return the stored form of a snapshot, tagged with its source."""
+        return {
+            "region_id": self.api.region_id,
+            "api_url": self.api.api_url,
+            **snapshot.as_dict(),
+        }
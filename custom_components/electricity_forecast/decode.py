@@ -0,0 +1,71 @@
+"""Decoding of backend payloads into price columns."""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, NamedTuple
+
+from homeassistant.util.json import json_loads
+
+
+class PayloadError(Exception):
+    """Raised when a decoded payload does not have the expected shape."""
+
+
+class PriceColumns(NamedTuple):
+    """Parallel columns of a price payload in backend order.
+
+    Only the fields the integration uses are kept; ``lower`` and ``upper``
+    are empty for payloads without a confidence band.
+    """
+
+    times: tuple[str, ...]
+    timestamps: tuple[int, ...]
+    prices: tuple[float, ...]
+    lower: tuple[float, ...] = ()
+    upper: tuple[float, ...] = ()
+
+
+EMPTY_COLUMNS = PriceColumns((), (), ())
+
+
+def epoch(value: str) -> int:
+    """Parse an API timestamp into a UTC epoch in seconds."""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        # Backend timestamps are UTC even when the offset is missing
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp())
+
+
+def _columns(rows: Any, price_key: str, band: bool) -> PriceColumns:
+    """Convert a list of row dicts into columns in a single pass."""
+    if not isinstance(rows, list):
+        raise PayloadError(f"Expected a list of rows, got {type(rows).__name__}")
+    times: list[str] = []
+    prices: list[float] = []
+    lower: list[float] = []
+    upper: list[float] = []
+    try:
+        for row in rows:
+            times.append(row["timestamp"])
+            prices.append(float(row[price_key]))
+            if band:
+                lower.append(float(row.get("confidence_lower") or 0))
+                upper.append(float(row.get("confidence_upper") or 0))
+        timestamps = tuple([epoch(time) for time in times])
+    except (KeyError, TypeError, ValueError) as err:
+        raise PayloadError(f"Malformed row in payload: {err!r}") from err
+    return PriceColumns(tuple(times), timestamps, tuple(prices), tuple(lower), tuple(upper))
+
+
+def decode_forecast(body: bytes) -> PriceColumns:
+    """Decode a predictions payload (a list of rows)."""
+    return _columns(json_loads(body), "predicted_price", band=True)
+
+
+def decode_historical(body: bytes) -> PriceColumns:
+    """Decode a historical payload (rows under ``data``)."""
+    payload = json_loads(body)
+    if not isinstance(payload, dict):
+        raise PayloadError(f"Expected an object, got {type(payload).__name__}")
+    return _columns(payload.get("data") or [], "price", band=False)
@@ -0,0 +1,43 @@
+"""Diagnostics support for Electricity Price Forecast."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_API_URL, DOMAIN
+
+TO_REDACT = {CONF_API_URL}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    coordinator = entry_data["coordinator"]
+    api = entry_data["api"]
+    snapshot = coordinator.data
+
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "regions_on_hub": len(entry_data["hub"].coordinators),
+            "refresh": coordinator.metrics.as_dict(),
+        },
+        "endpoints": {name: metrics.as_dict() for name, metrics in api.metrics.items()},
+        "snapshot": None
+        if snapshot is None
+        else {
+            "age_seconds": round(snapshot.age),
+            "points_24h": len(snapshot.forecast_24h),
+            "points_7d": len(snapshot.forecast_7d),
+            "points_historical": len(snapshot.historical),
+        },
+    }
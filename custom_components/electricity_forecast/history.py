@@ -0,0 +1,83 @@
+"""In-memory ring buffer of historical prices."""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable
+from datetime import datetime, timezone
+
+from .decode import PriceColumns
+
+
+def format_timestamp(epoch: float) -> str:
+    """Format an epoch the way the backend does."""
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class HistoryBuffer:
+    """Fixed-capacity, array-backed ring buffer of (timestamp, price) points.
+
+    Points are kept in timestamp order; once the buffer is full the oldest
+    point is overwritten.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize the buffer."""
+        self.capacity = capacity
+        self._timestamps = array("d", bytes(8 * capacity))
+        self._prices = array("d", bytes(8 * capacity))
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Return the number of stored points."""
+        return self._size
+
+    @property
+    def last_timestamp(self) -> float | None:
+        """Return the epoch of the newest point."""
+        if not self._size:
+            return None
+        return self._timestamps[(self._start + self._size - 1) % self.capacity]
+
+    def clear(self) -> None:
+        """Drop all points."""
+        self._start = 0
+        self._size = 0
+
+    def append(self, timestamp: float, price: float) -> None:
+        """Append a point, overwriting the oldest one when full."""
+        if self._size < self.capacity:
+            index = (self._start + self._size) % self.capacity
+            self._size += 1
+        else:
+            index = self._start
+            self._start = (self._start + 1) % self.capacity
+        self._timestamps[index] = timestamp
+        self._prices[index] = price
+
+    def extend(self, timestamps: Iterable[float], prices: Iterable[float]) -> int:
+        """Append the points newer than the newest stored point."""
+        last = self.last_timestamp
+        added = 0
+        for timestamp, price in zip(timestamps, prices):
+            if last is not None and timestamp <= last:
+                continue
+            self.append(timestamp, price)
+            last = timestamp
+            added += 1
+        return added
+
+    def columns(self, since: float | None = None) -> PriceColumns:
+        """Return the stored points as columns, oldest first."""
+        timestamps = []
+        prices = []
+        for offset in range(self._size):
+            index = (self._start + offset) % self.capacity
+            timestamp = self._timestamps[index]
+            if since is not None and timestamp < since:
+                continue
+            timestamps.append(int(timestamp))
+            prices.append(self._prices[index])
+        return PriceColumns(
+            tuple(map(format_timestamp, timestamps)), tuple(timestamps), tuple(prices)
+        )
@@ -0,0 +1,175 @@
+"""Shared fetch hub for config entries using the same backend."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from datetime import datetime, time, timedelta
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+from .api import CircuitBreaker, ElectricityForecastAPI, RequestGate
+from .const import DATA_HUBS, DEFAULT_MAX_STALENESS, DOMAIN
+from .coordinator import ElectricityForecastCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Prices change at the top of each hour; give the backend a moment to
+# publish the new data point before refreshing.
+REFRESH_DELAY = timedelta(minutes=2)
+
+# Random delay added to every refresh so instances do not poll in lockstep
+REFRESH_JITTER = timedelta(seconds=60)
+
+# Local times (backend time zone) when new forecasts are published; the
+# day-ahead auction results come out around 12:45 CET.
+FORECAST_PUBLICATION_TIMES = (time(12, 45),)
+FORECAST_TIME_ZONE = "Europe/Berlin"
+
+# Polling between boundaries starts at MIN_POLL_INTERVAL and doubles while
+# the data stays unchanged, up to MAX_POLL_INTERVAL.
+# Entities follow the clock on their own, so polling only has to catch
+# late or revised backend data.
+MIN_POLL_INTERVAL = timedelta(minutes=10)
+MAX_POLL_INTERVAL = timedelta(minutes=60)
+
+
+def next_refresh_boundary(now: datetime) -> datetime:
+    """Return the next hour boundary or forecast publication time, plus delay."""
+    now = dt_util.as_utc(now)
+    # Hours in UTC: local wall-clock arithmetic skips or repeats one on DST days
+    hour_start = now.replace(minute=0, second=0, microsecond=0)
+    candidates = [hour_start + REFRESH_DELAY, hour_start + timedelta(hours=1) + REFRESH_DELAY]
+
+    time_zone = dt_util.get_time_zone(FORECAST_TIME_ZONE)
+    today = now.astimezone(time_zone).date()
+    for day in (today, today + timedelta(days=1)):
+        for publication_time in FORECAST_PUBLICATION_TIMES:
+            publication = datetime.combine(day, publication_time, time_zone)
+            candidates.append(dt_util.as_utc(publication) + REFRESH_DELAY)
+
+    return min(candidate for candidate in candidates if candidate > now)
+
+
+class ElectricityForecastHub:
+    """Fetch hub shared by all regions configured against one backend.
+
+    The hub owns the HTTP session, a request gate that limits concurrent
+    requests and deduplicates identical in-flight ones, and a circuit
+    breaker that pauses requests while the backend is down. Coordinators of the
+    attached config entries do not poll on their own; the hub refreshes
+    them together shortly after each hour boundary and forecast
+    publication, backing off in between while nothing changes.
+    """
+
+    def __init__(self, hass: HomeAssistant, api_url: str) -> None:
+        """Initialize the hub."""
+        self.hass = hass
+        self.api_url = api_url.rstrip("/")
+        self.session = async_get_clientsession(hass)
+        self.gate = RequestGate()
+        self.breaker = CircuitBreaker()
+        self.coordinators: dict[str, ElectricityForecastCoordinator] = {}
+        self._unsub_refresh: CALLBACK_TYPE | None = None
+        self._refreshing = False
+        self._poll_interval = MIN_POLL_INTERVAL
+        self._at_boundary = False
+
+    def create_api(
+        self, region_id: str, max_staleness: float = DEFAULT_MAX_STALENESS * 3600
+    ) -> ElectricityForecastAPI:
+        """Create an API client that shares the hub's session, gate and breaker."""
+        return ElectricityForecastAPI(
+            self.api_url, self.session, region_id, self.gate, self.breaker, max_staleness
+        )
+
+    @callback
+    def async_attach(self, entry_id: str, coordinator: ElectricityForecastCoordinator) -> None:
+        """Attach a config entry's coordinator to the shared schedule."""
+        self.coordinators[entry_id] = coordinator
+        # A running refresh schedules the next one when it finishes
+        if self._unsub_refresh is None and not self._refreshing:
+            self._async_schedule_refresh()
+
+    @callback
+    def async_detach(self, entry_id: str) -> bool:
+        """Detach a config entry, returning whether the hub is now unused."""
+        self.coordinators.pop(entry_id, None)
+        if self.coordinators:
+            return False
+        if self._unsub_refresh is not None:
+            self._unsub_refresh()
+            self._unsub_refresh = None
+        return True
+
+    async def async_refresh_all(self) -> None:
+        """Refresh all attached regions together."""
+        _LOGGER.debug("Refreshing %d region(s) from %s", len(self.coordinators), self.api_url)
+        await asyncio.gather(
+            *(coordinator.async_refresh() for coordinator in list(self.coordinators.values()))
+        )
+
+    @callback
+    def _async_schedule_refresh(self) -> None:
+        """Schedule the next refresh, replacing any pending one."""
+        if self._unsub_refresh is not None:
+            self._unsub_refresh()
+        now = dt_util.utcnow()
+        if self.breaker.retry_at is not None:
+            # Backend is down; probe it when the breaker lets a request through
+            self._at_boundary = False
+            next_refresh = max(now, dt_util.utc_from_timestamp(self.breaker.retry_at))
+        else:
+            boundary = next_refresh_boundary(now)
+            self._at_boundary = boundary <= now + self._poll_interval
+            next_refresh = min(boundary, now + self._poll_interval)
+            next_refresh += timedelta(seconds=random.uniform(0, REFRESH_JITTER.total_seconds()))
+        _LOGGER.debug("Next refresh of %s at %s", self.api_url, next_refresh)
+        self._unsub_refresh = async_track_point_in_utc_time(
+            self.hass, self._async_scheduled_refresh, next_refresh
+        )
+
+    async def _async_scheduled_refresh(self, now: datetime) -> None:
+        """Refresh all regions and schedule the next run."""
+        self._unsub_refresh = None
+        self._refreshing = True
+        before = {entry_id: c.data for entry_id, c in self.coordinators.items()}
+
+        try:
+            await self.async_refresh_all()
+        finally:
+            self._refreshing = False
+            changed = any(
+                coordinator.data != before.get(entry_id)
+                for entry_id, coordinator in self.coordinators.items()
+            )
+            # A boundary refresh starts a new cycle of short polls
+            if changed or self._at_boundary:
+                self._poll_interval = MIN_POLL_INTERVAL
+            else:
+                self._poll_interval = min(self._poll_interval * 2, MAX_POLL_INTERVAL)
+
+            if self.coordinators:
+                self._async_schedule_refresh()
+
+
+@callback
+def async_get_hub(hass: HomeAssistant, api_url: str) -> ElectricityForecastHub:
+    """Return the hub for a backend URL, creating it when needed."""
+    hubs: dict[str, ElectricityForecastHub] = hass.data.setdefault(DOMAIN, {}).setdefault(
+        DATA_HUBS, {}
+    )
+    api_url = api_url.rstrip("/")
+    if api_url not in hubs:
+        hubs[api_url] = ElectricityForecastHub(hass, api_url)
+    return hubs[api_url]
+
+
+@callback
+def async_release_hub(hass: HomeAssistant, hub: ElectricityForecastHub, entry_id: str) -> None:
+    """Detach an entry from its hub and drop the hub once unused."""
+    if hub.async_detach(entry_id):
+        hass.data[DOMAIN][DATA_HUBS].pop(hub.api_url, None)
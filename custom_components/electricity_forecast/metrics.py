@@ -0,0 +1,137 @@
+"""Performance counters for Electricity Price Forecast."""
+from __future__ import annotations
+
+from collections import deque
+from typing import Any
+
+# Samples kept for rolling percentiles
+METRICS_WINDOW = 50
+
+
+class RollingStats:
+    """Last value and percentiles over a bounded window of samples."""
+
+    def __init__(self, size: int = METRICS_WINDOW) -> None:
+        """Initialize the window."""
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def add(self, value: float) -> None:
+        """Record a sample."""
+        self._samples.append(value)
+
+    @property
+    def last(self) -> float | None:
+        """Return the latest sample."""
+        return self._samples[-1] if self._samples else None
+
+    def percentile(self, share: float) -> float | None:
+        """Return the nearest-rank percentile of the window."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+    def as_dict(self, scale: float = 1.0, digits: int = 1) -> dict[str, Any]:
+        """Return last, p50, p95 and max, multiplied by ``scale``."""
+        if not self._samples:
+            return {"samples": 0}
+        return {
+            "last": round(self._samples[-1] * scale, digits),
+            "p50": round(self.percentile(0.5) * scale, digits),
+            "p95": round(self.percentile(0.95) * scale, digits),
+            "max": round(max(self._samples) * scale, digits),
+            "samples": len(self._samples),
+        }
+
+
+class EndpointMetrics:
+    """Counters for one backend endpoint of a region."""
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.cache_hits = 0
+        self.last_bytes = 0
+        self.total_bytes = 0
+        self.latency = RollingStats()
+        self.decode = RollingStats()
+
+    def record_response(self, latency: float, size: int, decode: float | None) -> None:
+        """Record a response; ``decode`` is None when a cached body was reused."""
+        self.requests += 1
+        self.consecutive_failures = 0
+        self.latency.add(latency)
+        self.last_bytes = size
+        self.total_bytes += size
+        if decode is None:
+            self.cache_hits += 1
+        else:
+            self.decode.add(decode)
+
+    def record_failure(self) -> None:
+        """Record a failed request."""
+        self.requests += 1
+        self.failures += 1
+        self.consecutive_failures += 1
+
+    @property
+    def cache_hit_ratio(self) -> float | None:
+        """Return the share of successful responses served from the cache."""
+        responses = self.requests - self.failures
+        return self.cache_hits / responses if responses else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters in a JSON-serializable form."""
+        ratio = self.cache_hit_ratio
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "cache_hit_ratio": round(ratio, 3) if ratio is not None else None,
+            "last_bytes": self.last_bytes,
+            "total_bytes": self.total_bytes,
+            "latency_ms": self.latency.as_dict(1000),
+            "decode_ms": self.decode.as_dict(1000, 2),
+        }
+
+
+class RefreshMetrics:
+    """Counters for the refreshes of one coordinator."""
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.refreshes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_error: str | None = None
+        self.duration = RollingStats()
+        self.snapshot = RollingStats()
+        self.fan_out = RollingStats()
+
+    def record_refresh(self, duration: float, snapshot: float) -> None:
+        """Record a successful refresh and the time spent building its snapshot."""
+        self.refreshes += 1
+        self.consecutive_failures = 0
+        self.duration.add(duration)
+        self.snapshot.add(snapshot)
+
+    def record_failure(self, err: Exception) -> None:
+        """Record a failed refresh."""
+        self.refreshes += 1
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_error = str(err)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters in a JSON-serializable form."""
+        return {
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+            "duration_ms": self.duration.as_dict(1000),
+            "snapshot_ms": self.snapshot.as_dict(1000, 2),
+            "fan_out_ms": self.fan_out.as_dict(1000, 2),
+        }
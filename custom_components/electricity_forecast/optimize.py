@@ -0,0 +1,350 @@
+"""Scheduling algorithms over forecast price arrays."""
+from __future__ import annotations
+
+import math
+import random
+import time
+from collections.abc import Sequence
+from operator import add
+from typing import NamedTuple
+
+
+class Window(NamedTuple):
+    """Contiguous block of slots ``[start, end)`` and its summed price."""
+
+    start: int
+    end: int
+    total: float
+
+
+def cheapest_window(prices: Sequence[float], start: int, end: int, length: int) -> Window | None:
+    """Return the cheapest block of ``length`` consecutive slots in ``[start, end)``.
+
+    Uses a running sum, so the search is O(n) regardless of ``length``.
+    """
+    if length <= 0 or end - start < length:
+        return None
+
+    total = sum(prices[start:start + length])
+    best_total, best_start = total, start
+    for index in range(start + length, end):
+        total += prices[index] - prices[index - length]
+        if total < best_total:
+            best_total, best_start = total, index - length + 1
+
+    return Window(best_start, best_start + length, best_total)
+
+
+def resample_profile(profile: Sequence[float], profile_step: float, slot_step: float) -> list[float]:
+    """Resample a power profile (kW per step) to the forecast's slot length.
+
+    Each slot gets the average power drawn during it, so the energy of the
+    profile is preserved. Steps are in seconds.
+    """
+    if profile_step == slot_step:
+        return list(profile)
+
+    duration = len(profile) * profile_step
+    slots = [0.0] * math.ceil(round(duration / slot_step, 6))
+    for index, power in enumerate(profile):
+        begin, finish = index * profile_step, (index + 1) * profile_step
+        while begin < finish:
+            slot = int(begin // slot_step)
+            boundary = min(finish, (slot + 1) * slot_step)
+            slots[slot] += power * (boundary - begin) / slot_step
+            begin = boundary
+    return slots
+
+
+def profile_costs(prices: Sequence[float], start: int, end: int, profile: Sequence[float]) -> list[float]:
+    """Return the cost of running ``profile`` from each start slot in ``[start, end)``.
+
+    ``costs[i]`` is the sum of ``profile[k] * prices[start + i + k]``, i.e. a
+    convolution of the profile with the price array. It is built one
+    profile step at a time with ``map`` over whole price slices, so the
+    Python-level loop only runs ``len(profile)`` times.
+    """
+    count = end - start - len(profile) + 1
+    if count <= 0:
+        return []
+
+    costs = [0.0] * count
+    for offset, power in enumerate(profile):
+        if power:
+            window = prices[start + offset:start + offset + count]
+            costs = list(map(add, costs, map(float(power).__mul__, window)))
+    return costs
+
+
+class Battery(NamedTuple):
+    """Home battery limits; powers in kW, efficiency as a round-trip fraction."""
+
+    capacity_kwh: float
+    charge_kw: float
+    discharge_kw: float
+    efficiency: float
+
+
+class BatteryPlan(NamedTuple):
+    """Grid-side power per slot (kW, positive = charging) and the plan's value."""
+
+    power: tuple[float, ...]
+    soc: tuple[float, ...]
+    value: float
+
+
+# Bounds on the number of state-of-charge steps the DP works with
+BATTERY_MIN_LEVELS = 20
+BATTERY_MAX_LEVELS = 100
+
+
+def battery_levels(battery: Battery, step_hours: float) -> int:
+    """Return how many state-of-charge steps to discretize a battery into.
+
+    Aims for a few steps per slot at the lower power limit so partial
+    charging is representable, bounded to keep the DP cheap.
+    """
+    slot_energy = min(battery.charge_kw, battery.discharge_kw) * step_hours
+    if slot_energy <= 0:
+        return BATTERY_MIN_LEVELS
+    levels = math.ceil(battery.capacity_kwh / slot_energy) * 4
+    return max(BATTERY_MIN_LEVELS, min(BATTERY_MAX_LEVELS, levels))
+
+
+def battery_schedule(
+    prices: Sequence[float],
+    step_hours: float,
+    battery: Battery,
+    initial_level: int,
+    levels: int,
+) -> BatteryPlan:
+    """Return the charge/discharge plan maximizing arbitrage value.
+
+    Dynamic programming over ``levels + 1`` discrete states of charge,
+    solved backwards from the end of the horizon. Charging buys energy and
+    discharging offsets it at the slot price (€/MWh); losses are split
+    evenly between charging and discharging. Energy left at the end of the
+    horizon is not valued.
+    """
+    delta = battery.capacity_kwh / levels
+    leg_efficiency = math.sqrt(battery.efficiency)
+    # Power limits apply on the grid side
+    up = min(levels, int(battery.charge_kw * step_hours * leg_efficiency / delta + 1e-9))
+    down = min(levels, int(battery.discharge_kw * step_hours / leg_efficiency / delta + 1e-9))
+
+    value = [0.0] * (levels + 1)
+    choices: list[list[int]] = []
+    for price in reversed(prices):
+        buy = delta / leg_efficiency * price / 1000
+        sell = delta * leg_efficiency * price / 1000
+        new_value = [0.0] * (levels + 1)
+        choice = [0] * (levels + 1)
+        for level in range(levels + 1):
+            best, best_level = value[level], level
+            for target in range(max(0, level - down), level):
+                candidate = value[target] + (level - target) * sell
+                if candidate > best:
+                    best, best_level = candidate, target
+            for target in range(level + 1, min(levels, level + up) + 1):
+                candidate = value[target] - (target - level) * buy
+                if candidate > best:
+                    best, best_level = candidate, target
+            new_value[level], choice[level] = best, best_level
+        value = new_value
+        choices.append(choice)
+    choices.reverse()
+
+    level = max(0, min(levels, initial_level))
+    total = value[level]
+    power: list[float] = []
+    soc: list[float] = []
+    for choice in choices:
+        target = choice[level]
+        moved = (target - level) * delta
+        if moved > 0:
+            power.append(moved / leg_efficiency / step_hours)
+        else:
+            power.append(moved * leg_efficiency / step_hours)
+        soc.append(target * delta)
+        level = target
+
+    return BatteryPlan(tuple(power), tuple(soc), total)
+
+
+def cheapest_slots(
+    prices: Sequence[float],
+    order: Sequence[int],
+    start: int,
+    end: int,
+    slot_energy: float,
+    energy: float,
+    first_share: float = 1.0,
+) -> list[tuple[int, float]]:
+    """Return the cheapest slots in ``[start, end)`` that cover ``energy``.
+
+    ``order`` is the series' slot indexes sorted by price; the walk stops as
+    soon as enough energy is planned. Only ``first_share`` of the slot at
+    ``start`` is available, for a slot that is already running. Returns
+    ``(index, share)`` pairs in time order, where ``share`` is the fraction
+    of the slot's energy used.
+    """
+    chosen: list[tuple[int, float]] = []
+    remaining = energy
+    for index in order:
+        if remaining <= 1e-9:
+            break
+        if start <= index < end:
+            available = first_share if index == start else 1.0
+            share = min(available, remaining / slot_energy)
+            chosen.append((index, share))
+            remaining -= share * slot_energy
+
+    chosen.sort()
+    return chosen
+
+
+# Randomized restarts without a better load schedule before the search stops
+SCHEDULE_PATIENCE = 50
+
+
+class Load(NamedTuple):
+    """Appliance run of ``length`` slots at constant power within ``[start, end)``."""
+
+    power_kw: float
+    length: int
+    start: int
+    end: int
+
+
+class LoadSchedule(NamedTuple):
+    """Start slot per load (``None`` when it could not be placed) and the cost."""
+
+    starts: tuple[int | None, ...]
+    # Sum of price * kW over the scheduled slots
+    cost: float
+    peak_kw: float
+    iterations: int
+
+
+def _best_start(
+    prices: Sequence[float], usage: list[float], load: Load, limit_kw: float
+) -> tuple[int | None, float]:
+    """Return the cheapest start for a load that keeps usage within the limit."""
+    length = load.length
+    headroom = limit_kw - load.power_kw + 1e-9
+    best_start, best_total = None, math.inf
+    if load.end - load.start < length or headroom < 0:
+        return None, math.inf
+
+    total = sum(prices[load.start:load.start + length])
+    for start in range(load.start, load.end - length + 1):
+        if start > load.start:
+            total += prices[start + length - 1] - prices[start - 1]
+        # Only check the cap for starts that would improve
+        if total < best_total and max(usage[start:start + length]) <= headroom:
+            best_start, best_total = start, total
+    return best_start, best_total * load.power_kw
+
+
+def _place(usage: list[float], load: Load, start: int, sign: int) -> None:
+    """Add (``sign`` 1) or remove (``sign`` -1) a load's power from the usage."""
+    for index in range(start, start + load.length):
+        usage[index] += sign * load.power_kw
+
+
+def _run_cost(prices: Sequence[float], load: Load, start: int) -> float:
+    """Return the cost of running a load from ``start``."""
+    return sum(prices[start:start + load.length]) * load.power_kw
+
+
+def _improve(
+    prices: Sequence[float],
+    loads: Sequence[Load],
+    starts: list[int | None],
+    usage: list[float],
+    limit_kw: float,
+    deadline: float,
+) -> None:
+    """Move single loads to their best feasible start until nothing improves."""
+    improved = True
+    while improved and time.monotonic() < deadline:
+        improved = False
+        for index, load in enumerate(loads):
+            current = starts[index]
+            if current is not None:
+                _place(usage, load, current, -1)
+            start, cost = _best_start(prices, usage, load, limit_kw)
+            if start is not None and (
+                current is None or cost < _run_cost(prices, load, current) - 1e-9
+            ):
+                starts[index] = start
+                improved = True
+            if starts[index] is not None:
+                _place(usage, load, starts[index], 1)
+
+
+def schedule_loads(
+    prices: Sequence[float], loads: Sequence[Load], limit_kw: float, time_limit: float
+) -> LoadSchedule:
+    """Schedule several loads at minimum total cost under a site power cap.
+
+    Loads are inserted greedily (largest energy first) at their cheapest
+    start that keeps every slot within ``limit_kw``, then improved by local
+    search that moves one load at a time. The search restarts from
+    randomized insertion orders and keeps the best schedule; fewer unplaced
+    loads always win over a lower cost. It stops as soon as the schedule
+    matches the cost of every load run at its own cheapest start, after
+    ``SCHEDULE_PATIENCE`` restarts without improvement, once every order
+    was tried, or after ``time_limit`` seconds at the latest.
+    """
+    deadline = time.monotonic() + time_limit
+    order = sorted(range(len(loads)), key=lambda i: -loads[i].power_kw * loads[i].length)
+    rng = random.Random(0)
+    best: tuple[int, float, list[int | None], list[float]] | None = None
+    iterations = 0
+
+    # Lower bound: each load at its cheapest start as if it ran alone
+    alone = [_best_start(prices, [0.0] * len(prices), load, limit_kw) for load in loads]
+    bound = (
+        sum(start is None for start, _cost in alone),
+        sum(cost for start, cost in alone if start is not None) + 1e-9,
+    )
+    orders = math.factorial(len(loads))
+    tried: set[tuple[int, ...]] = set()
+    stale = 0
+
+    while True:
+        tried.add(tuple(order))
+        usage = [0.0] * len(prices)
+        starts: list[int | None] = [None] * len(loads)
+        for index in order:
+            start, _cost = _best_start(prices, usage, loads[index], limit_kw)
+            if start is not None:
+                starts[index] = start
+                _place(usage, loads[index], start, 1)
+        _improve(prices, loads, starts, usage, limit_kw, deadline)
+        iterations += 1
+
+        unplaced = starts.count(None)
+        cost = sum(
+            _run_cost(prices, load, start)
+            for load, start in zip(loads, starts)
+            if start is not None
+        )
+        if best is None or (unplaced, cost) < best[:2]:
+            best = (unplaced, cost, starts, usage)
+            stale = 0
+        else:
+            stale += 1
+        if (
+            best[:2] <= bound
+            or stale >= SCHEDULE_PATIENCE
+            or len(tried) >= orders
+            or time.monotonic() >= deadline
+        ):
+            break
+        while tuple(order) in tried:
+            rng.shuffle(order)
+
+    _unplaced, cost, starts, usage = best
+    return LoadSchedule(tuple(starts), cost, max(usage, default=0.0), iterations)
@@ -0,0 +1,100 @@
+"""On-demand profiling of a refresh for Electricity Price Forecast."""
+from __future__ import annotations
+
+import cProfile
+import io
+import logging
+import pstats
+import time
+import tracemalloc
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+from .coordinator import ElectricityForecastCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Frames kept per allocation traceback while tracing
+TRACEMALLOC_FRAMES = 10
+
+# hass.data key set while a profile is running; cProfile cannot nest
+DATA_PROFILING = f"{DOMAIN}_profiling"
+
+
+async def async_profile_refresh(
+    hass: HomeAssistant, coordinator: ElectricityForecastCoordinator, top: int
+) -> str:
+    """Profile one refresh and the entity updates it triggers, returning the report path.
+
+    Nothing is traced outside this call. cProfile sees everything running on
+    the event loop meanwhile, not only this integration; executor jobs are
+    not included.
+    """
+    if hass.data.get(DATA_PROFILING):
+        raise ServiceValidationError("A profile is already running")
+    hass.data[DATA_PROFILING] = True
+
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    profiler = cProfile.Profile()
+
+    try:
+        allocations_before = tracemalloc.take_snapshot()
+        previous = coordinator.data
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            await coordinator.async_refresh()
+            # Unchanged data skips the fan-out; run it anyway to profile it
+            if coordinator.data == previous:
+                coordinator.async_update_listeners()
+        finally:
+            profiler.disable()
+        elapsed = time.perf_counter() - started
+        allocations_after = tracemalloc.take_snapshot()
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+        hass.data.pop(DATA_PROFILING, None)
+
+    region = coordinator.api.region_id
+    path = hass.config.path(
+        f"{DOMAIN}_profile_{region}_{dt_util.now().strftime('%Y%m%d_%H%M%S')}.txt"
+    )
+    header = (
+        f"Refresh of {region} at {dt_util.now().isoformat()}: {elapsed * 1000:.1f} ms, "
+        f"last update success: {coordinator.last_update_success}"
+    )
+    await hass.async_add_executor_job(
+        _write_report, path, header, profiler, allocations_before, allocations_after, top
+    )
+    _LOGGER.info("Wrote refresh profile of %s to %s", region, path)
+    return path
+
+
+def _write_report(
+    path: str,
+    header: str,
+    profiler: cProfile.Profile,
+    allocations_before: tracemalloc.Snapshot,
+    allocations_after: tracemalloc.Snapshot,
+    top: int,
+) -> None:
+    """Collate the profile and allocation statistics into a text file."""
+    report = io.StringIO()
+    report.write(f"{header}\n")
+
+    for sort, label in ((pstats.SortKey.CUMULATIVE, "cumulative"), (pstats.SortKey.TIME, "own")):
+        report.write(f"\n=== Top {top} functions by {label} time ===\n")
+        pstats.Stats(profiler, stream=report).sort_stats(sort).print_stats(top)
+
+    report.write(f"\n=== Top {top} allocation sites during the refresh ===\n")
+    for stat in allocations_after.compare_to(allocations_before, "lineno")[:top]:
+        report.write(f"{stat}\n")
+
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(report.getvalue())
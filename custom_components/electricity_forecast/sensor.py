@@ -1,7 +1,8 @@
 """Sensor platform for Electricity Price Forecast."""
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+import asyncio
+import logging
 from typing import Any
 
 from homeassistant.components.sensor import (
@@ -10,23 +11,36 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CURRENCY_EURO
-from homeassistant.core import HomeAssistant
+from homeassistant.const import (
+    CURRENCY_EURO,
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfInformation,
+    UnitOfTime,
+)
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.util import dt as dt_util
 
+from .battery import ACTIONS, action, async_plan_battery, battery_from_config, plan_as_list
 from .const import (
     ATTR_AVERAGE_TODAY,
     ATTR_CHEAPEST_HOURS,
     ATTR_EXPENSIVE_HOURS,
     ATTR_FORECAST_24H,
-    ATTR_FORECAST_7D,
     ATTR_MAX_TODAY,
     ATTR_MIN_TODAY,
     ATTR_RECOMMENDATION,
+    CONF_BATTERY_SOC_ENTITY,
+    DEFAULT_BATTERY_SOC,
     DOMAIN,
+    WINDOW_SENSOR_HOURS,
 )
+from .optimize import Battery, BatteryPlan
+from .snapshot import DayStats, PriceSeries
+
+_LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(
@@ -53,6 +67,28 @@ async def async_setup_entry(
         TomorrowVsTodaySensor(coordinator, api),
         WeeklyTrendSensor(coordinator, api),
     ]
+    sensors.extend(CheapestWindowSensor(coordinator, api, hours) for hours in WINDOW_SENSOR_HOURS)
+    sensors.extend(
+        sensor_class(coordinator, api)
+        for sensor_class in (
+            RefreshDurationSensor,
+            PayloadSizeSensor,
+            CacheHitRatioSensor,
+            ConsecutiveFailuresSensor,
+            EntityUpdateTimeSensor,
+        )
+    )
+
+    if battery := battery_from_config(config_entry.data):
+        sensors.append(
+            BatteryScheduleSensor(
+                coordinator,
+                api,
+                config_entry,
+                battery,
+                config_entry.data.get(CONF_BATTERY_SOC_ENTITY),
+            )
+        )
 
     async_add_entities(sensors)
 
@@ -77,6 +113,16 @@ class ElectricityPriceSensorBase(CoordinatorEntity, SensorEntity):
         }
 
 
+def _cheapest_day(series: PriceSeries) -> DayStats | None:
+    """Return the local calendar day with the lowest average price."""
+    return min(series.daily, key=lambda day: day.average, default=None)
+
+
+def _most_expensive_day(series: PriceSeries) -> DayStats | None:
+    """Return the local calendar day with the highest average price."""
+    return max(series.daily, key=lambda day: day.average, default=None)
+
+
 class CurrentPriceSensor(ElectricityPriceSensorBase):
     """Sensor for current electricity price."""
 
@@ -98,10 +144,10 @@ class CurrentPriceSensor(ElectricityPriceSensorBase):
         if not self.coordinator.data:
             return None
 
-        current = self.coordinator.data.get("current_price")
-        if current:
+        current_price = self.coordinator.data.current_price_at(dt_util.now())
+        if current_price is not None:
             # Convert from €/MWh to €/kWh (divide by 1000)
-            return round(current["price"] / 1000, 5)
+            return round(current_price / 1000, 5)
         return None
 
     @property
@@ -110,41 +156,40 @@ class CurrentPriceSensor(ElectricityPriceSensorBase):
         if not self.coordinator.data:
             return {}
 
-        current = self.coordinator.data.get("current_price")
-        predictions = self.coordinator.data.get("predictions_24h", [])
+        data = self.coordinator.data
+        now = dt_util.now()
+        current = data.current_at(now)
 
-        if current:
+        if current is not None:
+            current_price = current.price
             attrs = {
-                "last_updated": current["timestamp"],
+                "last_updated": current.time,
                 "region": self.api.region_id,
-                "price_mwh": round(current["price"], 2),  # Keep original unit available
+                "price_mwh": round(current_price, 2),  # Keep original unit available
+                "source": current.source,
+                "data_fetched_at": dt_util.utc_from_timestamp(data.fetched_at).isoformat(),
+                "data_age_minutes": round(data.age / 60),
+                "stale_endpoints": list(data.stale),
             }
 
             # Add price ranking and comparison
-            if predictions:
-                now = dt_util.now()
-                today_end = now.replace(hour=23, minute=59, second=59)
-                today_prices = [
-                    p["predicted_price"] for p in predictions
-                    if now <= datetime.fromisoformat(p["timestamp"].replace("Z", "+00:00")) <= today_end
-                ]
-
-                if today_prices:
-                    avg_price = sum(today_prices) / len(today_prices)
-                    sorted_prices = sorted(today_prices)
-                    current_price = current["price"]
-
-                    # Price rank (1 = cheapest, 24 = most expensive)
-                    rank = sum(1 for p in today_prices if p < current_price) + 1
-
-                    attrs.update({
-                        "price_rank_today": rank,
-                        "total_hours_today": len(today_prices),
-                        "vs_average_percent": round(((current_price - avg_price) / avg_price) * 100, 1),
-                        "is_below_average": current_price < avg_price,
-                        "is_in_cheapest_3": rank <= 3,
-                        "is_in_cheapest_6": rank <= 6,
-                    })
+            today = data.today_index(now)
+
+            if today is not None:
+                avg_price = today.average
+
+                # Price rank (1 = cheapest, 24 = most expensive)
+                rank = today.rank(current_price)
+
+                attrs.update({
+                    "price_rank_today": rank,
+                    "price_percentile_today": round(today.percentile(current_price), 1),
+                    "total_hours_today": len(today),
+                    "vs_average_percent": round(((current_price - avg_price) / avg_price) * 100, 1),
+                    "is_below_average": current_price < avg_price,
+                    "is_in_cheapest_3": rank <= 3,
+                    "is_in_cheapest_6": rank <= 6,
+                })
 
             return attrs
         return {}
@@ -171,11 +216,11 @@ class NextHourPriceSensor(ElectricityPriceSensorBase):
         if not self.coordinator.data:
             return None
 
-        predictions = self.coordinator.data.get("predictions_24h", [])
-        if predictions:
+        series = self.coordinator.data.forecast_24h
+        index = series.next_index(dt_util.now().timestamp())
+        if index < len(series):
             # Get the next hour prediction
-            next_pred = predictions[0]
-            return round(next_pred["predicted_price"] / 1000, 5)
+            return round(series.prices[index] / 1000, 5)
         return None
 
     @property
@@ -184,14 +229,14 @@ class NextHourPriceSensor(ElectricityPriceSensorBase):
         if not self.coordinator.data:
             return {}
 
-        predictions = self.coordinator.data.get("predictions_24h", [])
-        if predictions:
-            next_pred = predictions[0]
+        series = self.coordinator.data.forecast_24h
+        index = series.next_index(dt_util.now().timestamp())
+        if index < len(series):
             return {
-                "forecast_time": next_pred["timestamp"],
-                "confidence_lower": round(next_pred.get("confidence_lower", 0) / 1000, 5),
-                "confidence_upper": round(next_pred.get("confidence_upper", 0) / 1000, 5),
-                "price_mwh": round(next_pred["predicted_price"], 2),
+                "forecast_time": series.times[index],
+                "confidence_lower": round(series.lower[index] / 1000, 5),
+                "confidence_upper": round(series.upper[index] / 1000, 5),
+                "price_mwh": round(series.prices[index], 2),
                 "region": self.api.region_id,
             }
         return {}
@@ -218,21 +263,11 @@ class AveragePriceTodaySensor(ElectricityPriceSensorBase):
         if not self.coordinator.data:
             return None
 
-        predictions = self.coordinator.data.get("predictions_24h", [])
-        if not predictions:
-            return None
-
         # Filter today's predictions
-        now = dt_util.now()
-        today_end = now.replace(hour=23, minute=59, second=59)
-
-        today_prices = [
-            p["predicted_price"] for p in predictions
-            if now <= datetime.fromisoformat(p["timestamp"].replace("Z", "+00:00")) <= today_end
-        ]
+        today = self.coordinator.data.today_index(dt_util.now())
 
-        if today_prices:
-            return round(sum(today_prices) / len(today_prices) / 1000, 5)
+        if today is not None:
+            return round(today.average / 1000, 5)
         return None
 
     @property
@@ -241,25 +276,15 @@ class AveragePriceTodaySensor(ElectricityPriceSensorBase):
         if not self.coordinator.data:
             return {}
 
-        predictions = self.coordinator.data.get("predictions_24h", [])
-        if not predictions:
-            return {}
-
-        now = dt_util.now()
-        today_end = now.replace(hour=23, minute=59, second=59)
+        today = self.coordinator.data.today_index(dt_util.now())
 
-        today_prices = [
-            p["predicted_price"] for p in predictions
-            if now <= datetime.fromisoformat(p["timestamp"].replace("Z", "+00:00")) <= today_end
-        ]
-
-        if today_prices:
+        if today is not None:
             return {
-                ATTR_MIN_TODAY: round(min(today_prices) / 1000, 5),
-                ATTR_MAX_TODAY: round(max(today_prices) / 1000, 5),
-                "price_spread": round((max(today_prices) - min(today_prices)) / 1000, 5),
-                "price_spread_mwh": round(max(today_prices) - min(today_prices), 2),
-                "data_points": len(today_prices),
+                ATTR_MIN_TODAY: round(today.min / 1000, 5),
+                ATTR_MAX_TODAY: round(today.max / 1000, 5),
+                "price_spread": round((today.max - today.min) / 1000, 5),
+                "price_spread_mwh": round(today.max - today.min, 2),
+                "data_points": len(today),
             }
         return {}
 
@@ -284,11 +309,10 @@ class CheapestHourTodaySensor(ElectricityPriceSensorBase):
         if not self.coordinator.data:
             return None
 
-        predictions = self.coordinator.data.get("predictions_24h", [])
-        cheapest = self.api.get_cheapest_hours(predictions, 1)
+        today = self.coordinator.data.today_index(dt_util.now())
 
-        if cheapest:
-            return round(cheapest[0]["predicted_price"] / 1000, 5)
+        if today is not None:
+            return round(today.min / 1000, 5)
         return None
 
     @property
@@ -297,26 +321,25 @@ class CheapestHourTodaySensor(ElectricityPriceSensorBase):
         if not self.coordinator.data:
             return {}
 
-        predictions = self.coordinator.data.get("predictions_24h", [])
-        cheapest = self.api.get_cheapest_hours(predictions, 6)
+        series = self.coordinator.data.forecast_24h
+        now = dt_util.now()
+        cheapest = series.cheapest(*series.today_range(now), 6)
 
         if cheapest:
             # Calculate hours until cheapest
-            now = dt_util.now()
-            cheapest_time = datetime.fromisoformat(cheapest[0]["timestamp"].replace("Z", "+00:00"))
-            hours_until = max(0, int((cheapest_time - now).total_seconds() / 3600))
+            hours_until = max(0, int((series.timestamps[cheapest[0]] - now.timestamp()) / 3600))
 
             return {
-                "cheapest_time": cheapest[0]["timestamp"],
+                "cheapest_time": series.times[cheapest[0]],
                 "hours_until_cheapest": hours_until,
                 "starts_in_next_hour": hours_until <= 1,
                 ATTR_CHEAPEST_HOURS: [
                     {
-                        "time": p["timestamp"],
-                        "price": round(p["predicted_price"] / 1000, 5),
-                        "price_mwh": round(p["predicted_price"], 2)
+                        "time": series.times[i],
+                        "price": round(series.prices[i] / 1000, 5),
+                        "price_mwh": round(series.prices[i], 2)
                     }
-                    for p in cheapest
+                    for i in cheapest
                 ],
             }
         return {}
@@ -341,11 +364,10 @@ class ExpensiveHourTodaySensor(ElectricityPriceSensorBase):
         if not self.coordinator.data:
             return None
 
-        predictions = self.coordinator.data.get("predictions_24h", [])
-        expensive = self.api.get_expensive_hours(predictions, 1)
+        today = self.coordinator.data.today_index(dt_util.now())
 
-        if expensive:
-            return round(expensive[0]["predicted_price"] / 1000, 5)
+        if today is not None:
+            return round(today.max / 1000, 5)
         return None
 
     @property
@@ -354,26 +376,25 @@ class ExpensiveHourTodaySensor(ElectricityPriceSensorBase):
         if not self.coordinator.data:
             return {}
 
-        predictions = self.coordinator.data.get("predictions_24h", [])
-        expensive = self.api.get_expensive_hours(predictions, 6)
+        series = self.coordinator.data.forecast_24h
+        now = dt_util.now()
+        expensive = series.most_expensive(*series.today_range(now), 6)
 
         if expensive:
             # Calculate hours until most expensive
-            now = dt_util.now()
-            expensive_time = datetime.fromisoformat(expensive[0]["timestamp"].replace("Z", "+00:00"))
-            hours_until = max(0, int((expensive_time - now).total_seconds() / 3600))
+            hours_until = max(0, int((series.timestamps[expensive[0]] - now.timestamp()) / 3600))
 
             return {
-                "expensive_time": expensive[0]["timestamp"],
+                "expensive_time": series.times[expensive[0]],
                 "hours_until_expensive": hours_until,
                 "starts_in_next_hour": hours_until <= 1,
                 ATTR_EXPENSIVE_HOURS: [
                     {
-                        "time": p["timestamp"],
-                        "price": round(p["predicted_price"] / 1000, 5),
-                        "price_mwh": round(p["predicted_price"], 2)
+                        "time": series.times[i],
+                        "price": round(series.prices[i] / 1000, 5),
+                        "price_mwh": round(series.prices[i], 2)
                     }
-                    for p in expensive
+                    for i in expensive
                 ],
             }
         return {}
@@ -396,16 +417,13 @@ class PriceTrendSensor(ElectricityPriceSensorBase):
         if not self.coordinator.data:
             return None
 
-        current = self.coordinator.data.get("current_price")
-        predictions = self.coordinator.data.get("predictions_24h", [])
-
-        if not current or not predictions:
-            return "unknown"
-
-        current_price = current["price"]
-        next_3h_prices = [p["predicted_price"] for p in predictions[:3]]
+        now = dt_util.now()
+        current_price = self.coordinator.data.current_price_at(now)
+        series = self.coordinator.data.forecast_24h
+        index = series.next_index(now.timestamp())
+        next_3h_prices = series.prices[index:index + 3]
 
-        if not next_3h_prices:
+        if current_price is None or not next_3h_prices:
             return "unknown"
 
         avg_next_3h = sum(next_3h_prices) / len(next_3h_prices)
@@ -423,25 +441,23 @@ class PriceTrendSensor(ElectricityPriceSensorBase):
         if not self.coordinator.data:
             return {}
 
-        current = self.coordinator.data.get("current_price")
-        predictions = self.coordinator.data.get("predictions_24h", [])
+        now = dt_util.now()
+        current_price = self.coordinator.data.current_price_at(now)
+        series = self.coordinator.data.forecast_24h
+        index = series.next_index(now.timestamp())
+        next_3h_prices = series.prices[index:index + 3]
 
-        if not current or not predictions:
+        if current_price is None or not next_3h_prices:
             return {}
 
-        current_price = current["price"]
-        next_3h_prices = [p["predicted_price"] for p in predictions[:3]]
-
-        if next_3h_prices:
-            avg_next_3h = sum(next_3h_prices) / len(next_3h_prices)
-            change = ((avg_next_3h - current_price) / current_price) * 100
+        avg_next_3h = sum(next_3h_prices) / len(next_3h_prices)
+        change = ((avg_next_3h - current_price) / current_price) * 100
 
-            return {
-                "current_price": round(current_price, 2),
-                "avg_next_3h": round(avg_next_3h, 2),
-                "change_percent": round(change, 1),
-            }
-        return {}
+        return {
+            "current_price": round(current_price, 2),
+            "avg_next_3h": round(avg_next_3h, 2),
+            "change_percent": round(change, 1),
+        }
 
 
 class RecommendationSensor(ElectricityPriceSensorBase):
@@ -461,13 +477,7 @@ class RecommendationSensor(ElectricityPriceSensorBase):
         if not self.coordinator.data:
             return None
 
-        current = self.coordinator.data.get("current_price")
-        predictions = self.coordinator.data.get("predictions_24h", [])
-
-        if not current or not predictions:
-            return "unknown"
-
-        return self.api.get_recommendation(current["price"], predictions)
+        return self.coordinator.data.recommendation(dt_util.now())
 
     @property
     def extra_state_attributes(self):
@@ -507,6 +517,8 @@ class ForecastSensor(ElectricityPriceSensorBase):
     _attr_native_unit_of_measurement = f"{CURRENCY_EURO}/kWh"
     _attr_device_class = SensorDeviceClass.MONETARY
     _attr_icon = "mdi:chart-timeline-variant"
+    # Kept in the state for dashboards, but too large for the recorder
+    _unrecorded_attributes = frozenset({ATTR_FORECAST_24H})
 
     @property
     def unique_id(self):
@@ -519,9 +531,10 @@ class ForecastSensor(ElectricityPriceSensorBase):
         if not self.coordinator.data:
             return None
 
-        predictions = self.coordinator.data.get("predictions_24h", [])
-        if predictions:
-            return round(predictions[0]["predicted_price"] / 1000, 5)
+        series = self.coordinator.data.forecast_24h
+        index = series.next_index(dt_util.now().timestamp())
+        if index < len(series):
+            return round(series.prices[index] / 1000, 5)
         return None
 
     @property
@@ -530,28 +543,26 @@ class ForecastSensor(ElectricityPriceSensorBase):
         if not self.coordinator.data:
             return {}
 
-        predictions_24h = self.coordinator.data.get("predictions_24h", [])
-        predictions_7d = self.coordinator.data.get("predictions_7d", [])
+        series_24h = self.coordinator.data.forecast_24h
+        series_7d = self.coordinator.data.forecast_7d
 
         return {
             ATTR_FORECAST_24H: [
                 {
-                    "time": p["timestamp"],
-                    "price": round(p["predicted_price"] / 1000, 5),
-                    "conf_lower": round(p.get("confidence_lower", 0) / 1000, 5),
-                    "conf_upper": round(p.get("confidence_upper", 0) / 1000, 5),
-                }
-                for p in predictions_24h
-            ],
-            ATTR_FORECAST_7D: [
-                {
-                    "time": p["timestamp"],
-                    "price": round(p["predicted_price"] / 1000, 5),
+                    "time": time,
+                    "price": round(price / 1000, 5),
+                    "conf_lower": round(lower / 1000, 5),
+                    "conf_upper": round(upper / 1000, 5),
                 }
-                for p in predictions_7d
+                for time, price, lower, upper in zip(
+                    series_24h.times, series_24h.prices, series_24h.lower, series_24h.upper
+                )
             ],
-            "forecast_24h_count": len(predictions_24h),
-            "forecast_7d_count": len(predictions_7d),
+            # The full 7-day forecast is available via the get_forecast service
+            "forecast_24h_count": len(series_24h),
+            "forecast_7d_count": len(series_7d),
+            "forecast_7d_start": series_7d.times[0] if series_7d else None,
+            "forecast_7d_end": series_7d.times[-1] if series_7d else None,
         }
 
 
@@ -562,6 +573,7 @@ class SevenDayForecastSensor(ElectricityPriceSensorBase):
     _attr_native_unit_of_measurement = f"{CURRENCY_EURO}/kWh"
     _attr_device_class = SensorDeviceClass.MONETARY
     _attr_icon = "mdi:calendar-week"
+    _unrecorded_attributes = frozenset({"forecast_7d_full", "daily_averages"})
 
     @property
     def unique_id(self):
@@ -574,9 +586,8 @@ class SevenDayForecastSensor(ElectricityPriceSensorBase):
         if not self.coordinator.data:
             return None
 
-        predictions_7d = self.coordinator.data.get("predictions_7d", [])
-        if predictions_7d:
-            prices = [p["predicted_price"] for p in predictions_7d]
+        prices = self.coordinator.data.forecast_7d.prices
+        if prices:
             return round(sum(prices) / len(prices) / 1000, 5)
         return None
 
@@ -586,39 +597,39 @@ class SevenDayForecastSensor(ElectricityPriceSensorBase):
         if not self.coordinator.data:
             return {}
 
-        predictions_7d = self.coordinator.data.get("predictions_7d", [])
+        series = self.coordinator.data.forecast_7d
+        prices = series.prices
 
-        if not predictions_7d:
+        if not prices:
             return {}
 
-        prices = [p["predicted_price"] for p in predictions_7d]
-
-        # Calculate daily averages
-        daily_averages = []
-        for i in range(0, len(predictions_7d), 24):
-            day_data = predictions_7d[i:i+24]
-            if day_data:
-                day_prices = [p["predicted_price"] for p in day_data]
-                daily_averages.append({
-                    "date": day_data[0]["timestamp"][:10],
-                    "avg_price": round(sum(day_prices) / len(day_prices) / 1000, 5),
-                    "min_price": round(min(day_prices) / 1000, 5),
-                    "max_price": round(max(day_prices) / 1000, 5),
-                })
+        daily_averages = [
+            {
+                "date": day.day.isoformat(),
+                "avg_price": round(day.average / 1000, 5),
+                "min_price": round(day.min / 1000, 5),
+                "max_price": round(day.max / 1000, 5),
+                "median_price": round(day.median / 1000, 5),
+                "cheapest_hour": series.times[day.argmin],
+                "most_expensive_hour": series.times[day.argmax],
+                "hours": day.count,
+            }
+            for day in series.daily
+        ]
 
         return {
             "forecast_7d_full": [
                 {
-                    "time": p["timestamp"],
-                    "price": round(p["predicted_price"] / 1000, 5),
+                    "time": time,
+                    "price": round(price / 1000, 5),
                 }
-                for p in predictions_7d
+                for time, price in zip(series.times, prices)
             ],
             "daily_averages": daily_averages,
-            "min_price_7d": round(min(prices) / 1000, 5),
-            "max_price_7d": round(max(prices) / 1000, 5),
-            "avg_price_7d": round(sum(prices) / len(prices) / 1000, 5),
-            "total_hours": len(predictions_7d),
+            "min_price_7d": round(min(day.min for day in series.daily) / 1000, 5),
+            "max_price_7d": round(max(day.max for day in series.daily) / 1000, 5),
+            "avg_price_7d": round(sum(day.total for day in series.daily) / len(prices) / 1000, 5),
+            "total_hours": len(prices),
             "region": self.api.region_id,
         }
 
@@ -640,29 +651,12 @@ class CheapestDayNext7DSensor(ElectricityPriceSensorBase):
         if not self.coordinator.data:
             return None
 
-        predictions_7d = self.coordinator.data.get("predictions_7d", [])
-        if not predictions_7d:
+        cheapest = _cheapest_day(self.coordinator.data.forecast_7d)
+        if cheapest is None:
             return None
 
-        # Calculate daily averages
-        daily_data = {}
-        for pred in predictions_7d:
-            date = pred["timestamp"][:10]  # Get date part (YYYY-MM-DD)
-            if date not in daily_data:
-                daily_data[date] = []
-            daily_data[date].append(pred["predicted_price"])
-
-        # Find cheapest day
-        daily_averages = {date: sum(prices) / len(prices) for date, prices in daily_data.items()}
-        if not daily_averages:
-            return None
-
-        cheapest_date = min(daily_averages, key=daily_averages.get)
-
         # Format as weekday name
-        # from datetime import datetime as dt
-        date_obj = datetime.fromisoformat(cheapest_date)
-        return date_obj.strftime("%A, %b %d")  # e.g., "Monday, Oct 23"
+        return cheapest.day.strftime("%A, %b %d")  # e.g., "Monday, Oct 23"
 
     @property
     def extra_state_attributes(self):
@@ -670,40 +664,24 @@ class CheapestDayNext7DSensor(ElectricityPriceSensorBase):
         if not self.coordinator.data:
             return {}
 
-        predictions_7d = self.coordinator.data.get("predictions_7d", [])
-        if not predictions_7d:
+        series = self.coordinator.data.forecast_7d
+        cheapest = _cheapest_day(series)
+        if cheapest is None:
             return {}
 
-        # Calculate daily averages
-        daily_data = {}
-        for pred in predictions_7d:
-            date = pred["timestamp"][:10]
-            if date not in daily_data:
-                daily_data[date] = []
-            daily_data[date].append(pred["predicted_price"])
-
-        daily_averages = {date: sum(prices) / len(prices) for date, prices in daily_data.items()}
-        if not daily_averages:
-            return {}
-
-        cheapest_date = min(daily_averages, key=daily_averages.get)
-        cheapest_price = daily_averages[cheapest_date]
-
         # Days until cheapest
-        # from datetime import datetime as dt
-        today = dt_util.now().date()
-        cheapest_date_obj = datetime.fromisoformat(cheapest_date).date()
-        days_until = (cheapest_date_obj - today).days
+        days_until = (cheapest.day - dt_util.now().date()).days
 
         return {
-            "date": cheapest_date,
-            "average_price": round(cheapest_price / 1000, 5),
+            "date": cheapest.day.isoformat(),
+            "average_price": round(cheapest.average / 1000, 5),
+            "cheapest_hour": series.times[cheapest.argmin],
             "days_until": days_until,
             "is_today": days_until == 0,
             "is_tomorrow": days_until == 1,
             "all_daily_averages": {
-                date: round(avg / 1000, 5)
-                for date, avg in sorted(daily_averages.items())
+                day.day.isoformat(): round(day.average / 1000, 5)
+                for day in series.daily
             }
         }
 
@@ -725,27 +703,11 @@ class MostExpensiveDayNext7DSensor(ElectricityPriceSensorBase):
         if not self.coordinator.data:
             return None
 
-        predictions_7d = self.coordinator.data.get("predictions_7d", [])
-        if not predictions_7d:
-            return None
-
-        # Calculate daily averages
-        daily_data = {}
-        for pred in predictions_7d:
-            date = pred["timestamp"][:10]
-            if date not in daily_data:
-                daily_data[date] = []
-            daily_data[date].append(pred["predicted_price"])
-
-        daily_averages = {date: sum(prices) / len(prices) for date, prices in daily_data.items()}
-        if not daily_averages:
+        expensive = _most_expensive_day(self.coordinator.data.forecast_7d)
+        if expensive is None:
             return None
 
-        expensive_date = max(daily_averages, key=daily_averages.get)
-
-        # from datetime import datetime as dt
-        date_obj = datetime.fromisoformat(expensive_date)
-        return date_obj.strftime("%A, %b %d")
+        return expensive.day.strftime("%A, %b %d")
 
     @property
     def extra_state_attributes(self):
@@ -753,32 +715,17 @@ class MostExpensiveDayNext7DSensor(ElectricityPriceSensorBase):
         if not self.coordinator.data:
             return {}
 
-        predictions_7d = self.coordinator.data.get("predictions_7d", [])
-        if not predictions_7d:
+        series = self.coordinator.data.forecast_7d
+        expensive = _most_expensive_day(series)
+        if expensive is None:
             return {}
 
-        daily_data = {}
-        for pred in predictions_7d:
-            date = pred["timestamp"][:10]
-            if date not in daily_data:
-                daily_data[date] = []
-            daily_data[date].append(pred["predicted_price"])
-
-        daily_averages = {date: sum(prices) / len(prices) for date, prices in daily_data.items()}
-        if not daily_averages:
-            return {}
-
-        expensive_date = max(daily_averages, key=daily_averages.get)
-        expensive_price = daily_averages[expensive_date]
-
-        # from datetime import datetime as dt
-        today = dt_util.now().date()
-        expensive_date_obj = datetime.fromisoformat(expensive_date).date()
-        days_until = (expensive_date_obj - today).days
+        days_until = (expensive.day - dt_util.now().date()).days
 
         return {
-            "date": expensive_date,
-            "average_price": round(expensive_price / 1000, 5),
+            "date": expensive.day.isoformat(),
+            "average_price": round(expensive.average / 1000, 5),
+            "most_expensive_hour": series.times[expensive.argmax],
             "days_until": days_until,
             "is_today": days_until == 0,
             "is_tomorrow": days_until == 1,
@@ -803,33 +750,11 @@ class TomorrowVsTodaySensor(ElectricityPriceSensorBase):
         if not self.coordinator.data:
             return None
 
-        predictions_24h = self.coordinator.data.get("predictions_24h", [])
-        predictions_7d = self.coordinator.data.get("predictions_7d", [])
-
-        if not predictions_24h or not predictions_7d:
-            return None
-
-        # from datetime import datetime as dt
-        today = dt_util.now().date()
-        tomorrow = (dt_util.now() + timedelta(days=1)).date()
-
-        # Calculate today's average
-        today_prices = [
-            p["predicted_price"] for p in predictions_24h
-            if datetime.fromisoformat(p["timestamp"].replace("Z", "+00:00")).date() == today
-        ]
-
-        # Calculate tomorrow's average
-        tomorrow_prices = [
-            p["predicted_price"] for p in predictions_7d
-            if datetime.fromisoformat(p["timestamp"].replace("Z", "+00:00")).date() == tomorrow
-        ]
-
-        if not today_prices or not tomorrow_prices:
+        averages = self.coordinator.data.daily_comparison(dt_util.now())
+        if averages is None:
             return None
 
-        today_avg = sum(today_prices) / len(today_prices)
-        tomorrow_avg = sum(tomorrow_prices) / len(tomorrow_prices)
+        today_avg, tomorrow_avg = averages
 
         # Percentage difference
         diff_percent = ((tomorrow_avg - today_avg) / today_avg) * 100
@@ -842,31 +767,11 @@ class TomorrowVsTodaySensor(ElectricityPriceSensorBase):
         if not self.coordinator.data:
             return {}
 
-        predictions_24h = self.coordinator.data.get("predictions_24h", [])
-        predictions_7d = self.coordinator.data.get("predictions_7d", [])
-
-        if not predictions_24h or not predictions_7d:
+        averages = self.coordinator.data.daily_comparison(dt_util.now())
+        if averages is None:
             return {}
 
-        # from datetime import datetime as dt
-        today = dt_util.now().date()
-        tomorrow = (dt_util.now() + timedelta(days=1)).date()
-
-        today_prices = [
-            p["predicted_price"] for p in predictions_24h
-            if datetime.fromisoformat(p["timestamp"].replace("Z", "+00:00")).date() == today
-        ]
-
-        tomorrow_prices = [
-            p["predicted_price"] for p in predictions_7d
-            if datetime.fromisoformat(p["timestamp"].replace("Z", "+00:00")).date() == tomorrow
-        ]
-
-        if not today_prices or not tomorrow_prices:
-            return {}
-
-        today_avg = sum(today_prices) / len(today_prices)
-        tomorrow_avg = sum(tomorrow_prices) / len(tomorrow_prices)
+        today_avg, tomorrow_avg = averages
 
         return {
             "today_average": round(today_avg / 1000, 5),
@@ -893,13 +798,13 @@ class WeeklyTrendSensor(ElectricityPriceSensorBase):
         if not self.coordinator.data:
             return None
 
-        predictions_7d = self.coordinator.data.get("predictions_7d", [])
-        if not predictions_7d or len(predictions_7d) < 48:
+        prices = self.coordinator.data.forecast_7d.prices
+        if len(prices) < 48:
             return None
 
         # Compare first 24h vs last 24h
-        first_day_avg = sum(p["predicted_price"] for p in predictions_7d[:24]) / 24
-        last_day_avg = sum(p["predicted_price"] for p in predictions_7d[-24:]) / 24
+        first_day_avg = sum(prices[:24]) / 24
+        last_day_avg = sum(prices[-24:]) / 24
 
         diff_percent = ((last_day_avg - first_day_avg) / first_day_avg) * 100
 
@@ -916,13 +821,13 @@ class WeeklyTrendSensor(ElectricityPriceSensorBase):
         if not self.coordinator.data:
             return {}
 
-        predictions_7d = self.coordinator.data.get("predictions_7d", [])
-        if not predictions_7d or len(predictions_7d) < 48:
+        prices = self.coordinator.data.forecast_7d.prices
+        if len(prices) < 48:
             return {}
 
-        first_day_avg = sum(p["predicted_price"] for p in predictions_7d[:24]) / 24
-        last_day_avg = sum(p["predicted_price"] for p in predictions_7d[-24:]) / 24
-        week_avg = sum(p["predicted_price"] for p in predictions_7d) / len(predictions_7d)
+        first_day_avg = sum(prices[:24]) / 24
+        last_day_avg = sum(prices[-24:]) / 24
+        week_avg = sum(prices) / len(prices)
 
         diff_percent = ((last_day_avg - first_day_avg) / first_day_avg) * 100
 
@@ -934,3 +839,344 @@ class WeeklyTrendSensor(ElectricityPriceSensorBase):
             "prices_increasing": diff_percent > 5,
             "prices_decreasing": diff_percent < -5,
         }
+
+
+class CheapestWindowSensor(ElectricityPriceSensorBase):
+    """Sensor for the start of the cheapest contiguous block of hours."""
+
+    _attr_device_class = SensorDeviceClass.TIMESTAMP
+    _attr_icon = "mdi:timer-sand"
+
+    def __init__(self, coordinator, api, hours: int):
+        """Initialize the sensor."""
+        super().__init__(coordinator, api)
+        self.hours = hours
+        self._attr_name = f"Cheapest {hours}h Window"
+
+    @property
+    def unique_id(self):
+        """Return unique ID."""
+        return f"{self.api.region_id}_cheapest_window_{self.hours}h"
+
+    @property
+    def native_value(self):
+        """Return when the cheapest window in the 24h forecast starts."""
+        if not self.coordinator.data:
+            return None
+
+        series, window = self.coordinator.data.cheapest_window(self.hours, dt_util.now().timestamp())
+        if window is None:
+            return None
+        return dt_util.utc_from_timestamp(series.timestamps[window.start])
+
+    @property
+    def extra_state_attributes(self):
+        """Return additional attributes."""
+        if not self.coordinator.data:
+            return {}
+
+        now = dt_util.now().timestamp()
+        series, window = self.coordinator.data.cheapest_window(self.hours, now)
+        if window is None:
+            return {}
+
+        average = window.total / (window.end - window.start)
+        hours_until = max(0, int((series.timestamps[window.start] - now) / 3600))
+
+        return {
+            "end": series.end_time(window.end),
+            "average_price": round(average / 1000, 5),
+            "average_price_mwh": round(average, 2),
+            "hours_until_start": hours_until,
+            "duration_hours": self.hours,
+        }
+
+
+class BatteryScheduleSensor(ElectricityPriceSensorBase):
+    """Sensor for the planned battery action in the current slot."""
+
+    _attr_device_class = SensorDeviceClass.ENUM
+    _attr_options = ACTIONS
+    _attr_icon = "mdi:home-battery"
+    # The full plan is only useful live
+    _unrecorded_attributes = frozenset({"schedule"})
+
+    def __init__(
+        self,
+        coordinator,
+        api,
+        entry: ConfigEntry,
+        battery: Battery,
+        soc_entity: str | None,
+    ):
+        """Initialize the sensor."""
+        super().__init__(coordinator, api)
+        self._attr_name = "Battery Schedule"
+        self.entry = entry
+        self.battery = battery
+        self.soc_entity = soc_entity
+        self._plan: tuple[PriceSeries, int, BatteryPlan] | None = None
+        self._plan_task: asyncio.Task | None = None
+        self._replan = False
+
+    @property
+    def unique_id(self):
+        """Return unique ID."""
+        return f"{self.api.region_id}_battery_schedule"
+
+    async def async_added_to_hass(self) -> None:
+        """Solve the first plan when added."""
+        await super().async_added_to_hass()
+        self._async_schedule_plan()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Re-plan on new data and on the clock; the solve runs in the executor."""
+        self._async_schedule_plan()
+
+    @callback
+    def _async_schedule_plan(self) -> None:
+        """Start a re-plan, or queue one behind the re-plan already running."""
+        if self._plan_task is not None and not self._plan_task.done():
+            self._replan = True
+            return
+        self._plan_task = self.entry.async_create_background_task(
+            self.hass,
+            self._async_update_plan(),
+            f"{DOMAIN} battery schedule {self.api.region_id}",
+        )
+
+    def _state_of_charge(self) -> float:
+        """Return the battery's state of charge in percent."""
+        if self.soc_entity and (state := self.hass.states.get(self.soc_entity)):
+            try:
+                return float(state.state)
+            except ValueError:
+                pass
+        return DEFAULT_BATTERY_SOC
+
+    async def _async_update_plan(self) -> None:
+        """Solve the plan for the current slot and write the state."""
+        self._replan = True
+        while self._replan:
+            self._replan = False
+            try:
+                if self.coordinator.data is None:
+                    self._plan = None
+                else:
+                    self._plan = await async_plan_battery(
+                        self.hass,
+                        self.coordinator.data,
+                        self.battery,
+                        self._state_of_charge(),
+                        dt_util.now(),
+                    )
+            except Exception:
+                _LOGGER.exception("Error planning the battery schedule for %s", self.api.region_id)
+                self._plan = None
+            self.async_write_ha_state()
+
+    def _current_offset(self) -> int | None:
+        """Return the plan offset of the slot covering now."""
+        if self._plan is None:
+            return None
+        series, start, plan = self._plan
+        index = series.slot_at(dt_util.now().timestamp())
+        if index is None or not 0 <= index - start < len(plan.power):
+            return None
+        return index - start
+
+    @property
+    def native_value(self):
+        """Return the planned action for the current slot."""
+        offset = self._current_offset()
+        if offset is None:
+            return None
+        return action(self._plan[2].power[offset])
+
+    @property
+    def extra_state_attributes(self):
+        """Return additional attributes."""
+        offset = self._current_offset()
+        if offset is None:
+            return {}
+
+        series, start, plan = self._plan
+        return {
+            "power_kw": round(plan.power[offset], 2),
+            "target_soc_kwh": round(plan.soc[offset], 2),
+            "expected_value": round(plan.value, 2),
+            "schedule": plan_as_list(series, start + offset, plan._replace(
+                power=plan.power[offset:], soc=plan.soc[offset:]
+            )),
+        }
+
+
+class DiagnosticSensorBase(ElectricityPriceSensorBase):
+    """Base class for the refresh performance sensors, disabled by default."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    async def async_added_to_hass(self) -> None:
+        """Update after every refresh, also when the data did not change."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_add_metrics_listener(self.async_write_ha_state)
+        )
+
+    @property
+    def available(self) -> bool:
+        """Stay available while refreshes fail."""
+        return True
+
+
+class RefreshDurationSensor(DiagnosticSensorBase):
+    """Sensor for the duration of the last refresh."""
+
+    _attr_name = "Refresh Duration"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_icon = "mdi:timer-outline"
+
+    @property
+    def unique_id(self):
+        """Return unique ID."""
+        return f"{self.api.region_id}_refresh_duration"
+
+    @property
+    def native_value(self):
+        """Return the duration of the last successful refresh in ms."""
+        last = self.coordinator.metrics.duration.last
+        return round(last * 1000, 1) if last is not None else None
+
+    @property
+    def extra_state_attributes(self):
+        """Return percentiles and the per-endpoint latency and decode time."""
+        metrics = self.coordinator.metrics
+        return {
+            "refresh_ms": metrics.duration.as_dict(1000),
+            "snapshot_ms": metrics.snapshot.as_dict(1000, 2),
+            "endpoints": {
+                name: {
+                    "latency_ms": endpoint.latency.as_dict(1000),
+                    "decode_ms": endpoint.decode.as_dict(1000, 2),
+                }
+                for name, endpoint in self.api.metrics.items()
+            },
+        }
+
+
+class PayloadSizeSensor(DiagnosticSensorBase):
+    """Sensor for the bytes received by the last refresh."""
+
+    _attr_name = "Payload Size"
+    _attr_device_class = SensorDeviceClass.DATA_SIZE
+    _attr_native_unit_of_measurement = UnitOfInformation.BYTES
+    _attr_icon = "mdi:download-network"
+
+    @property
+    def unique_id(self):
+        """Return unique ID."""
+        return f"{self.api.region_id}_payload_size"
+
+    @property
+    def native_value(self):
+        """Return the body bytes of the last response per endpoint, summed."""
+        return sum(endpoint.last_bytes for endpoint in self.api.metrics.values())
+
+    @property
+    def extra_state_attributes(self):
+        """Return the last and total bytes per endpoint."""
+        return {
+            name: {"last_bytes": endpoint.last_bytes, "total_bytes": endpoint.total_bytes}
+            for name, endpoint in self.api.metrics.items()
+        }
+
+
+class CacheHitRatioSensor(DiagnosticSensorBase):
+    """Sensor for the share of responses answered from the HTTP cache."""
+
+    _attr_name = "Cache Hit Ratio"
+    _attr_native_unit_of_measurement = PERCENTAGE
+    _attr_icon = "mdi:cached"
+
+    @property
+    def unique_id(self):
+        """Return unique ID."""
+        return f"{self.api.region_id}_cache_hit_ratio"
+
+    @property
+    def native_value(self):
+        """Return the share of 304 responses over all endpoints in %."""
+        endpoints = self.api.metrics.values()
+        responses = sum(endpoint.requests - endpoint.failures for endpoint in endpoints)
+        if not responses:
+            return None
+        return round(sum(endpoint.cache_hits for endpoint in endpoints) / responses * 100, 1)
+
+    @property
+    def extra_state_attributes(self):
+        """Return the ratio per endpoint."""
+        return {
+            name: round(ratio * 100, 1) if (ratio := endpoint.cache_hit_ratio) is not None else None
+            for name, endpoint in self.api.metrics.items()
+        }
+
+
+class ConsecutiveFailuresSensor(DiagnosticSensorBase):
+    """Sensor for the number of refreshes that failed in a row."""
+
+    _attr_name = "Consecutive Failures"
+    _attr_icon = "mdi:alert-circle-outline"
+
+    @property
+    def unique_id(self):
+        """Return unique ID."""
+        return f"{self.api.region_id}_consecutive_failures"
+
+    @property
+    def native_value(self):
+        """Return the failed refreshes since the last success."""
+        return self.coordinator.metrics.consecutive_failures
+
+    @property
+    def extra_state_attributes(self):
+        """Return failure counts per endpoint and the last error."""
+        metrics = self.coordinator.metrics
+        return {
+            "failures": metrics.failures,
+            "refreshes": metrics.refreshes,
+            "last_error": metrics.last_error,
+            "endpoints": {
+                name: endpoint.consecutive_failures
+                for name, endpoint in self.api.metrics.items()
+            },
+        }
+
+
+class EntityUpdateTimeSensor(DiagnosticSensorBase):
+    """Sensor for the time spent updating all entities of the region."""
+
+    _attr_name = "Entity Update Time"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_icon = "mdi:timer-sand"
+    _attr_suggested_display_precision = 2
+
+    @property
+    def unique_id(self):
+        """Return unique ID."""
+        return f"{self.api.region_id}_entity_update_time"
+
+    @property
+    def native_value(self):
+        """Return the duration of the last entity fan-out in ms."""
+        last = self.coordinator.metrics.fan_out.last
+        return round(last * 1000, 2) if last is not None else None
+
+    @property
+    def extra_state_attributes(self):
+        """Return fan-out percentiles."""
+        return self.coordinator.metrics.fan_out.as_dict(1000, 2)
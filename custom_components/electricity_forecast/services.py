@@ -0,0 +1,545 @@
+"""Services for Electricity Price Forecast."""
+from __future__ import annotations
+
+import heapq
+from datetime import datetime, time, timedelta
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import persistent_notification
+from homeassistant.const import ATTR_NAME
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.service import async_register_admin_service
+
+from homeassistant.util import dt as dt_util
+
+from .battery import async_plan_battery, plan_as_list
+from .charging import ChargeRequest
+from .const import (
+    ATTR_ALTERNATIVES,
+    ATTR_CAPACITY,
+    ATTR_CHARGE_POWER,
+    ATTR_DEADLINE,
+    ATTR_DISCHARGE_POWER,
+    ATTR_DURATION,
+    ATTR_DURATIONS,
+    ATTR_EARLIEST_START,
+    ATTR_EFFICIENCY,
+    ATTR_ENERGY,
+    ATTR_HORIZON,
+    ATTR_HORIZON_HOURS,
+    ATTR_HOURS,
+    ATTR_LOADS,
+    ATTR_MAX_POWER,
+    ATTR_POWER,
+    ATTR_PROFILE,
+    ATTR_PROFILE_STEP,
+    ATTR_REGION,
+    ATTR_SITE_LIMIT,
+    ATTR_STATE_OF_CHARGE,
+    ATTR_TIME_LIMIT,
+    ATTR_TOP,
+    DATA_HUBS,
+    DEFAULT_BATTERY_EFFICIENCY,
+    DEFAULT_BATTERY_POWER,
+    DEFAULT_BATTERY_SOC,
+    DEFAULT_EV_CHARGE_POWER,
+    DEFAULT_SCHEDULE_TIME_LIMIT,
+    DOMAIN,
+    HORIZON_7D,
+    HORIZON_24H,
+    HORIZON_NEXT_HOURS,
+    HORIZON_TODAY,
+    SERVICE_CANCEL_EV_CHARGING,
+    SERVICE_FIND_CHEAPEST_WINDOW,
+    SERVICE_GET_CHEAPEST_HOURS,
+    SERVICE_GET_EXPENSIVE_HOURS,
+    SERVICE_GET_FORECAST,
+    SERVICE_OPTIMIZE_BATTERY,
+    SERVICE_OPTIMIZE_LOAD_PROFILE,
+    SERVICE_PLAN_EV_CHARGING,
+    SERVICE_PROFILE_REFRESH,
+    SERVICE_SCHEDULE_LOADS,
+)
+from .optimize import Battery, Load, schedule_loads
+from .profiler import async_profile_refresh
+from .snapshot import PriceSnapshot
+
+GET_FORECAST_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_REGION): cv.string,
+        vol.Optional(ATTR_HORIZON, default=HORIZON_24H): vol.In([HORIZON_24H, HORIZON_7D]),
+    }
+)
+
+HOURS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_REGION): cv.string,
+        vol.Optional(ATTR_HOURS, default=3): vol.All(vol.Coerce(int), vol.Range(min=1, max=168)),
+        vol.Optional(ATTR_HORIZON, default=HORIZON_TODAY): vol.In(
+            [HORIZON_TODAY, HORIZON_NEXT_HOURS, HORIZON_7D]
+        ),
+        vol.Optional(ATTR_HORIZON_HOURS, default=24): vol.All(
+            vol.Coerce(float), vol.Range(min=0.25, max=168)
+        ),
+    }
+)
+
+FIND_CHEAPEST_WINDOW_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_REGION): cv.string,
+        vol.Required(ATTR_DURATIONS): vol.All(
+            cv.ensure_list, [vol.All(vol.Coerce(float), vol.Range(min=0.25, max=72))]
+        ),
+        vol.Optional(ATTR_EARLIEST_START): cv.datetime,
+        vol.Optional(ATTR_DEADLINE): cv.datetime,
+    }
+)
+
+OPTIMIZE_BATTERY_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_REGION): cv.string,
+        vol.Optional(ATTR_CAPACITY): vol.All(vol.Coerce(float), vol.Range(min=0.1, max=1000)),
+        vol.Optional(ATTR_CHARGE_POWER): vol.All(vol.Coerce(float), vol.Range(min=0.1, max=1000)),
+        vol.Optional(ATTR_DISCHARGE_POWER): vol.All(
+            vol.Coerce(float), vol.Range(min=0.1, max=1000)
+        ),
+        vol.Optional(ATTR_EFFICIENCY): vol.All(vol.Coerce(float), vol.Range(min=1, max=100)),
+        vol.Optional(ATTR_STATE_OF_CHARGE, default=DEFAULT_BATTERY_SOC): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=100)
+        ),
+    }
+)
+
+PLAN_EV_CHARGING_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_REGION): cv.string,
+        vol.Required(ATTR_ENERGY): vol.All(vol.Coerce(float), vol.Range(min=0.1, max=500)),
+        # A full datetime or a time of day (the next occurrence)
+        vol.Required(ATTR_DEADLINE): vol.Any(cv.datetime, cv.time),
+        vol.Optional(ATTR_MAX_POWER, default=DEFAULT_EV_CHARGE_POWER): vol.All(
+            vol.Coerce(float), vol.Range(min=0.1, max=1000)
+        ),
+        vol.Optional(ATTR_EARLIEST_START): cv.datetime,
+    }
+)
+
+CANCEL_EV_CHARGING_SCHEMA = vol.Schema({vol.Optional(ATTR_REGION): cv.string})
+
+LOAD_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_NAME): cv.string,
+        vol.Required(ATTR_DURATION): vol.All(vol.Coerce(float), vol.Range(min=0.25, max=72)),
+        vol.Required(ATTR_POWER): vol.All(vol.Coerce(float), vol.Range(min=0.01, max=1000)),
+        vol.Optional(ATTR_EARLIEST_START): cv.datetime,
+        vol.Optional(ATTR_DEADLINE): cv.datetime,
+    }
+)
+
+SCHEDULE_LOADS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_REGION): cv.string,
+        vol.Required(ATTR_LOADS): vol.All(
+            cv.ensure_list, vol.Length(min=1, max=100), [LOAD_SCHEMA]
+        ),
+        vol.Required(ATTR_SITE_LIMIT): vol.All(vol.Coerce(float), vol.Range(min=0.1, max=10000)),
+        vol.Optional(ATTR_TIME_LIMIT, default=DEFAULT_SCHEDULE_TIME_LIMIT): vol.All(
+            vol.Coerce(float), vol.Range(min=0.1, max=30)
+        ),
+    }
+)
+
+OPTIMIZE_LOAD_PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_REGION): cv.string,
+        vol.Required(ATTR_PROFILE): vol.All(
+            cv.ensure_list,
+            vol.Length(min=1, max=7 * 24 * 4),
+            [vol.All(vol.Coerce(float), vol.Range(min=0, max=1000))],
+        ),
+        vol.Optional(ATTR_PROFILE_STEP, default=15): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=1440)
+        ),
+        vol.Optional(ATTR_EARLIEST_START): cv.datetime,
+        vol.Optional(ATTR_DEADLINE): cv.datetime,
+        vol.Optional(ATTR_ALTERNATIVES, default=3): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=24)
+        ),
+    }
+)
+
+PROFILE_REFRESH_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_REGION): cv.string,
+        vol.Optional(ATTR_TOP, default=30): vol.All(vol.Coerce(int), vol.Range(min=5, max=500)),
+    }
+)
+
+
+def _as_epoch(value: datetime | None) -> float | None:
+    """Convert a service datetime (local time when naive) to an epoch."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    return value.timestamp()
+
+
+def _as_deadline(value: datetime | time) -> float:
+    """Convert a service deadline to an epoch; times of day mean the next occurrence."""
+    if isinstance(value, datetime):
+        return _as_epoch(value)
+
+    now = dt_util.now()
+    deadline = now.replace(
+        hour=value.hour, minute=value.minute, second=value.second, microsecond=0
+    )
+    if deadline <= now:
+        deadline += timedelta(days=1)
+    return deadline.timestamp()
+
+
+def _get_entry_data(hass: HomeAssistant, call: ServiceCall) -> dict[str, Any]:
+    """Return the ``hass.data`` of the config entry a service call targets."""
+    region = call.data.get(ATTR_REGION)
+    entries = [
+        entry_data
+        for key, entry_data in hass.data.get(DOMAIN, {}).items()
+        if key != DATA_HUBS
+        and (region is None or entry_data["api"].region_id == region)
+    ]
+
+    if not entries:
+        raise ServiceValidationError(f"No Electricity Forecast entry for region {region}")
+    if len(entries) > 1 and region is None:
+        raise ServiceValidationError("Several regions are configured, specify a region")
+    return entries[0]
+
+
+def _get_snapshot(hass: HomeAssistant, call: ServiceCall) -> tuple[str, PriceSnapshot]:
+    """Return the region and current snapshot a service call targets."""
+    entry_data = _get_entry_data(hass, call)
+    snapshot = entry_data["coordinator"].data
+    if snapshot is None:
+        raise ServiceValidationError("No forecast data available yet")
+    return entry_data["api"].region_id, snapshot
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration's services."""
+
+    async def async_get_forecast(call: ServiceCall) -> ServiceResponse:
+        """Return the full forecast of a region."""
+        region, snapshot = _get_snapshot(hass, call)
+        if call.data[ATTR_HORIZON] == HORIZON_7D:
+            series = snapshot.forecast_7d
+        else:
+            series = snapshot.forecast_24h
+
+        forecast: list[dict[str, Any]] = [
+            {
+                "time": time,
+                "price": round(price / 1000, 5),
+                "price_mwh": round(price, 2),
+                "conf_lower": round(lower / 1000, 5),
+                "conf_upper": round(upper / 1000, 5),
+            }
+            for time, price, lower, upper in zip(
+                series.times, series.prices, series.lower, series.upper
+            )
+        ]
+        return {"region": region, "forecast": forecast}
+
+    def _select_hours(call: ServiceCall, expensive: bool) -> ServiceResponse:
+        """Return the cheapest or most expensive hours within a horizon."""
+        region, snapshot = _get_snapshot(hass, call)
+        series, start, end = snapshot.horizon(
+            call.data[ATTR_HORIZON], dt_util.now(), call.data[ATTR_HORIZON_HOURS]
+        )
+        select = series.most_expensive if expensive else series.cheapest
+
+        return {
+            "region": region,
+            "horizon": call.data[ATTR_HORIZON],
+            "hours": [
+                {
+                    "time": series.times[i],
+                    "price": round(series.prices[i] / 1000, 5),
+                    "price_mwh": round(series.prices[i], 2),
+                }
+                for i in select(start, end, call.data[ATTR_HOURS])
+            ],
+        }
+
+    async def async_get_cheapest_hours(call: ServiceCall) -> ServiceResponse:
+        """Return the cheapest hours of a region."""
+        return _select_hours(call, expensive=False)
+
+    async def async_get_expensive_hours(call: ServiceCall) -> ServiceResponse:
+        """Return the most expensive hours of a region."""
+        return _select_hours(call, expensive=True)
+
+    async def async_find_cheapest_window(call: ServiceCall) -> ServiceResponse:
+        """Return the cheapest contiguous window for each requested duration."""
+        region, snapshot = _get_snapshot(hass, call)
+        earliest = _as_epoch(call.data.get(ATTR_EARLIEST_START)) or dt_util.now().timestamp()
+        deadline = _as_epoch(call.data.get(ATTR_DEADLINE))
+
+        windows: list[dict[str, Any]] = []
+        for hours in call.data[ATTR_DURATIONS]:
+            series, window = snapshot.cheapest_window(hours, earliest, deadline)
+            if window is None:
+                windows.append({"duration_hours": hours, "start": None})
+                continue
+
+            average = window.total / (window.end - window.start)
+            windows.append(
+                {
+                    "duration_hours": hours,
+                    "start": series.times[window.start],
+                    "end": series.end_time(window.end),
+                    "average_price": round(average / 1000, 5),
+                    "average_price_mwh": round(average, 2),
+                }
+            )
+        return {"region": region, "windows": windows}
+
+    async def async_optimize_load_profile(call: ServiceCall) -> ServiceResponse:
+        """Return the cheapest start times for an appliance's power profile."""
+        region, snapshot = _get_snapshot(hass, call)
+        profile = tuple(call.data[ATTR_PROFILE])
+        step = call.data[ATTR_PROFILE_STEP] * 60
+        earliest = _as_epoch(call.data.get(ATTR_EARLIEST_START)) or dt_util.now().timestamp()
+        deadline = _as_epoch(call.data.get(ATTR_DEADLINE))
+
+        series, start, length, costs = snapshot.load_profile_costs(
+            profile, step, earliest, deadline
+        )
+        ranked = heapq.nsmallest(
+            call.data[ATTR_ALTERNATIVES] + 1, range(len(costs)), key=costs.__getitem__
+        )
+        starts = [
+            {
+                "start": series.times[start + offset],
+                "end": series.end_time(start + offset + length),
+                "cost": round(costs[offset], 4),
+            }
+            for offset in ranked
+        ]
+
+        return {
+            "region": region,
+            "energy_kwh": round(sum(profile) * step / 3600, 3),
+            "best": starts[0] if starts else None,
+            "alternatives": starts[1:],
+        }
+
+    async def async_optimize_battery(call: ServiceCall) -> ServiceResponse:
+        """Return a charge/idle/discharge plan for a battery."""
+        region, snapshot = _get_snapshot(hass, call)
+        # Call fields override the battery configured on the entry
+        battery: Battery = _get_entry_data(hass, call)["battery"] or Battery(
+            0, DEFAULT_BATTERY_POWER, DEFAULT_BATTERY_POWER, DEFAULT_BATTERY_EFFICIENCY / 100
+        )
+        overrides = {
+            field: call.data[key]
+            for field, key in (
+                ("capacity_kwh", ATTR_CAPACITY),
+                ("charge_kw", ATTR_CHARGE_POWER),
+                ("discharge_kw", ATTR_DISCHARGE_POWER),
+            )
+            if key in call.data
+        }
+        if ATTR_EFFICIENCY in call.data:
+            overrides["efficiency"] = call.data[ATTR_EFFICIENCY] / 100
+        battery = battery._replace(**overrides)
+        if not battery.capacity_kwh:
+            raise ServiceValidationError(
+                "No battery configured for this region, specify capacity_kwh"
+            )
+
+        result = await async_plan_battery(
+            hass, snapshot, battery, call.data[ATTR_STATE_OF_CHARGE], dt_util.now()
+        )
+        if result is None:
+            return {"region": region, "expected_value": None, "schedule": []}
+
+        series, start, plan = result
+        return {
+            "region": region,
+            "expected_value": round(plan.value, 2),
+            "schedule": plan_as_list(series, start, plan),
+        }
+
+    async def async_plan_ev_charging(call: ServiceCall) -> ServiceResponse:
+        """Plan the cheapest slots to charge an EV before a deadline."""
+        region, snapshot = _get_snapshot(hass, call)
+        deadline = _as_deadline(call.data[ATTR_DEADLINE])
+        earliest = _as_epoch(call.data.get(ATTR_EARLIEST_START)) or dt_util.now().timestamp()
+        if deadline <= earliest:
+            raise ServiceValidationError("The deadline must be after the earliest start")
+
+        request = ChargeRequest(
+            call.data[ATTR_ENERGY], call.data[ATTR_MAX_POWER], earliest, deadline
+        )
+        plan = _get_entry_data(hass, call)["charging"].async_set_request(snapshot, request)
+        if not call.return_response:
+            return None
+        return {"region": region, **plan.as_dict()}
+
+    async def async_cancel_ev_charging(call: ServiceCall) -> None:
+        """Drop the active EV charging plan."""
+        _get_entry_data(hass, call)["charging"].async_cancel()
+
+    async def async_schedule_loads(call: ServiceCall) -> ServiceResponse:
+        """Return a joint schedule for several loads under a site power cap."""
+        region, snapshot = _get_snapshot(hass, call)
+        now = dt_util.now().timestamp()
+        requested = [
+            (
+                _as_epoch(load.get(ATTR_EARLIEST_START)) or now,
+                _as_epoch(load.get(ATTR_DEADLINE)),
+            )
+            for load in call.data[ATTR_LOADS]
+        ]
+        deadlines = [deadline for _earliest, deadline in requested]
+        if None in deadlines:
+            series = snapshot.forecast_7d
+        else:
+            series = snapshot.planning_series(max(deadlines))
+
+        loads = [
+            Load(
+                load[ATTR_POWER],
+                series.slots(load[ATTR_DURATION]),
+                *series.window_range(earliest, deadline),
+            )
+            for load, (earliest, deadline) in zip(call.data[ATTR_LOADS], requested)
+        ]
+        schedule = await hass.async_add_executor_job(
+            schedule_loads,
+            series.prices,
+            loads,
+            call.data[ATTR_SITE_LIMIT],
+            call.data[ATTR_TIME_LIMIT],
+        )
+
+        # €/MWh * kW * hours per slot / 1000 = €
+        scale = series.step / 3600 / 1000
+        scheduled: list[dict[str, Any]] = []
+        for request, load, start in zip(call.data[ATTR_LOADS], loads, schedule.starts):
+            if start is None:
+                scheduled.append({"name": request[ATTR_NAME], "start": None})
+                continue
+            scheduled.append(
+                {
+                    "name": request[ATTR_NAME],
+                    "start": series.times[start],
+                    "end": series.end_time(start + load.length),
+                    "power_kw": load.power_kw,
+                    "cost": round(
+                        sum(series.prices[start:start + load.length]) * load.power_kw * scale, 4
+                    ),
+                }
+            )
+
+        return {
+            "region": region,
+            "cost": round(schedule.cost * scale, 4),
+            "peak_kw": round(schedule.peak_kw, 2),
+            "unscheduled": schedule.starts.count(None),
+            "iterations": schedule.iterations,
+            "loads": scheduled,
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_CHEAPEST_HOURS,
+        async_get_cheapest_hours,
+        schema=HOURS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_EXPENSIVE_HOURS,
+        async_get_expensive_hours,
+        schema=HOURS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_FIND_CHEAPEST_WINDOW,
+        async_find_cheapest_window,
+        schema=FIND_CHEAPEST_WINDOW_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_OPTIMIZE_LOAD_PROFILE,
+        async_optimize_load_profile,
+        schema=OPTIMIZE_LOAD_PROFILE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_OPTIMIZE_BATTERY,
+        async_optimize_battery,
+        schema=OPTIMIZE_BATTERY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PLAN_EV_CHARGING,
+        async_plan_ev_charging,
+        schema=PLAN_EV_CHARGING_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CANCEL_EV_CHARGING,
+        async_cancel_ev_charging,
+        schema=CANCEL_EV_CHARGING_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SCHEDULE_LOADS,
+        async_schedule_loads,
+        schema=SCHEDULE_LOADS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    async def async_profile_refresh_service(call: ServiceCall) -> None:
+        """Profile a refresh and write the report to the config directory."""
+        entry_data = _get_entry_data(hass, call)
+        path = await async_profile_refresh(hass, entry_data["coordinator"], call.data[ATTR_TOP])
+        persistent_notification.async_create(
+            hass,
+            f"Refresh profile of {entry_data['api'].region_id} written to `{path}`",
+            title="Electricity Forecast profile",
+            notification_id=f"{DOMAIN}_{SERVICE_PROFILE_REFRESH}",
+        )
+
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_PROFILE_REFRESH,
+        async_profile_refresh_service,
+        schema=PROFILE_REFRESH_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_FORECAST,
+        async_get_forecast,
+        schema=GET_FORECAST_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
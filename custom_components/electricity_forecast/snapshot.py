@@ -0,0 +1,531 @@
+"""Pre-parsed price snapshot shared by all entities."""
+from __future__ import annotations
+
+import heapq
+import math
+import time
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+from functools import cached_property
+from typing import TYPE_CHECKING, Any, NamedTuple, TypeVar
+
+from homeassistant.util import dt as dt_util
+
+from .const import HORIZON_NEXT_HOURS, HORIZON_TODAY
+from .optimize import Window, cheapest_window, profile_costs, resample_profile
+
+if TYPE_CHECKING:
+    from .decode import PriceColumns
+
+_T = TypeVar("_T")
+
+# Derived results kept per snapshot before the memo is reset
+RESULT_CACHE_SIZE = 256
+
+
+def parse_timestamp(value: str) -> float:
+    """Parse an API timestamp into a UTC epoch."""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        # Backend timestamps are UTC even when the offset is missing
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _next_midnight(epoch: float) -> tuple[date, float]:
+    """Return the local date of an epoch and the epoch of the following midnight."""
+    local = dt_util.as_local(dt_util.utc_from_timestamp(epoch))
+    midnight = datetime.combine(local.date() + timedelta(days=1), dt_time(), local.tzinfo)
+    return local.date(), midnight.timestamp()
+
+
+class DayStats(NamedTuple):
+    """Aggregates of one local calendar day; indexes refer to the series."""
+
+    day: date
+    start: int
+    end: int
+    total: float
+    min: float
+    max: float
+    argmin: int
+    argmax: int
+    p25: float
+    median: float
+    p75: float
+
+    @property
+    def count(self) -> int:
+        """Return the number of slots of the day."""
+        return self.end - self.start
+
+    @property
+    def average(self) -> float:
+        """Return the average price of the day."""
+        return self.total / (self.end - self.start)
+
+
+def _day_stats(day: date, start: int, end: int, prices: tuple[float, ...]) -> DayStats:
+    """Aggregate the prices of one day."""
+    day_prices = prices[start:end]
+    ordered = sorted(day_prices)
+    count = len(ordered)
+    argmin = argmax = start
+    for index in range(start + 1, end):
+        if prices[index] < prices[argmin]:
+            argmin = index
+        elif prices[index] > prices[argmax]:
+            argmax = index
+    return DayStats(
+        day=day,
+        start=start,
+        end=end,
+        total=sum(day_prices),
+        min=ordered[0],
+        max=ordered[-1],
+        argmin=argmin,
+        argmax=argmax,
+        p25=ordered[count // 4],
+        median=ordered[count // 2],
+        p75=ordered[min(count * 3 // 4, count - 1)],
+    )
+
+
+class CurrentPrice(NamedTuple):
+    """Price of the slot covering a point in time."""
+
+    price: float
+    time: str | None
+    source: str | None
+
+
+class PriceIndex(NamedTuple):
+    """Sorted prices of an index range for rank and percentile lookups."""
+
+    sorted_prices: tuple[float, ...]
+    total: float
+
+    def __len__(self) -> int:
+        """Return the number of prices."""
+        return len(self.sorted_prices)
+
+    @property
+    def min(self) -> float:
+        """Return the lowest price."""
+        return self.sorted_prices[0]
+
+    @property
+    def max(self) -> float:
+        """Return the highest price."""
+        return self.sorted_prices[-1]
+
+    @property
+    def average(self) -> float:
+        """Return the average price."""
+        return self.total / len(self.sorted_prices)
+
+    def rank(self, price: float) -> int:
+        """Return the rank of a price (1 = cheapest); ties share the best rank."""
+        return bisect_left(self.sorted_prices, price) + 1
+
+    def percentile(self, price: float) -> float:
+        """Return the share of prices strictly below ``price``, in percent."""
+        return 100 * bisect_left(self.sorted_prices, price) / len(self.sorted_prices)
+
+    def is_in_cheapest(self, price: float, count: int) -> bool:
+        """Return whether a price is among the ``count`` cheapest."""
+        return self.rank(price) <= count
+
+    def quantile(self, percent: float) -> float:
+        """Return the price below which ``percent`` of the prices fall."""
+        position = int(percent / 100 * len(self.sorted_prices))
+        return self.sorted_prices[min(position, len(self.sorted_prices) - 1)]
+
+
+@dataclass(frozen=True)
+class PriceSeries:
+    """Columnar price series with pre-parsed timestamps.
+
+    Prices are kept in €/MWh like the backend returns them. ``daily`` holds
+    the aggregates per local calendar day, built once with the series.
+    """
+
+    timestamps: tuple[float, ...] = ()
+    times: tuple[str, ...] = ()
+    prices: tuple[float, ...] = ()
+    lower: tuple[float, ...] = ()
+    upper: tuple[float, ...] = ()
+    daily: tuple[DayStats, ...] = field(default=(), compare=False, repr=False)
+    # Slot length in seconds
+    step: float = 3600
+
+    @classmethod
+    def from_decoded(cls, columns: PriceColumns | None) -> PriceSeries:
+        """Build a series from decoded API columns, adopting them without copies."""
+        if columns is None or not columns.timestamps:
+            return cls()
+        return cls._build(
+            columns.timestamps,
+            columns.times,
+            columns.prices,
+            columns.lower or (0.0,) * len(columns.timestamps),
+            columns.upper or (0.0,) * len(columns.timestamps),
+        )
+
+    @classmethod
+    def from_columns(
+        cls,
+        times: list[str],
+        prices: list[float],
+        lower: list[float] | None = None,
+        upper: list[float] | None = None,
+    ) -> PriceSeries:
+        """Build a series from parallel lists."""
+        if not times:
+            return cls()
+
+        return cls._build(
+            tuple(parse_timestamp(time) for time in times),
+            tuple(times),
+            tuple(map(float, prices)),
+            tuple(map(float, lower or [0] * len(times))),
+            tuple(map(float, upper or [0] * len(times))),
+        )
+
+    @classmethod
+    def _build(
+        cls,
+        timestamps: tuple[float, ...],
+        times: tuple[str, ...],
+        price_values: tuple[float, ...],
+        lower: tuple[float, ...],
+        upper: tuple[float, ...],
+    ) -> PriceSeries:
+        """Build a series from complete columns, aggregating the days."""
+
+        # Local dates only change at local midnight, so only convert there;
+        # this also keeps 23- and 25-hour DST days intact.
+        daily: list[DayStats] = []
+        day, midnight = _next_midnight(timestamps[0])
+        day_start = 0
+        for index, epoch in enumerate(timestamps):
+            if epoch >= midnight:
+                daily.append(_day_stats(day, day_start, index, price_values))
+                day, midnight = _next_midnight(epoch)
+                day_start = index
+        daily.append(_day_stats(day, day_start, len(timestamps), price_values))
+
+        return cls(
+            timestamps=timestamps,
+            times=times,
+            prices=price_values,
+            lower=lower,
+            upper=upper,
+            daily=tuple(daily),
+            step=min(
+                (b - a for a, b in zip(timestamps, timestamps[1:]) if b > a),
+                default=3600,
+            ),
+        )
+
+    def as_dict(self) -> dict[str, list]:
+        """Return a compact, JSON-serializable representation."""
+        data = {"times": list(self.times), "prices": list(self.prices)}
+        # Historical series carry no confidence band
+        if any(self.lower) or any(self.upper):
+            data["lower"] = list(self.lower)
+            data["upper"] = list(self.upper)
+        return data
+
+    def __len__(self) -> int:
+        """Return the number of data points."""
+        return len(self.timestamps)
+
+    def slot_at(self, epoch: float) -> int | None:
+        """Return the index of the slot covering ``epoch``."""
+        index = bisect_right(self.timestamps, epoch) - 1
+        if index >= 0 and epoch - self.timestamps[index] < self.step:
+            return index
+        return None
+
+    def next_index(self, epoch: float) -> int:
+        """Return the index of the first slot starting after ``epoch``."""
+        return bisect_right(self.timestamps, epoch)
+
+    def day(self, day: date) -> DayStats | None:
+        """Return the aggregates of a local calendar day."""
+        for stats in self.daily:
+            if stats.day == day:
+                return stats
+        return None
+
+    def day_range(self, day: date) -> tuple[int, int]:
+        """Return the index range covering a local calendar day."""
+        stats = self.day(day)
+        return (stats.start, stats.end) if stats else (0, 0)
+
+    def today_range(self, now: datetime) -> tuple[int, int]:
+        """Return the index range from ``now`` until the end of today."""
+        start, end = self.day_range(now.date())
+        return max(start, bisect_left(self.timestamps, now.timestamp())), end
+
+    def today_prices(self, now: datetime) -> tuple[float, ...]:
+        """Return the remaining prices of today."""
+        start, end = self.today_range(now)
+        return self.prices[start:end]
+
+    @cached_property
+    def order(self) -> tuple[int, ...]:
+        """Return the slot indexes sorted by price, cheapest first."""
+        return tuple(sorted(range(len(self.prices)), key=self.prices.__getitem__))
+
+    def index(self, start: int, end: int) -> PriceIndex | None:
+        """Return a sorted price index of a range, derived from ``order``."""
+        if start >= end:
+            return None
+        prices = self.prices
+        return PriceIndex(
+            tuple(prices[i] for i in self.order if start <= i < end),
+            sum(prices[start:end]),
+        )
+
+    def cheapest(self, start: int, end: int, count: int) -> list[int]:
+        """Return indexes of the ``count`` cheapest slots in a range, cheapest first."""
+        return heapq.nsmallest(count, range(start, end), key=self.prices.__getitem__)
+
+    def most_expensive(self, start: int, end: int, count: int) -> list[int]:
+        """Return indexes of the ``count`` most expensive slots in a range."""
+        return heapq.nlargest(count, range(start, end), key=self.prices.__getitem__)
+
+    def slots(self, hours: float) -> int:
+        """Return how many slots cover ``hours``, rounded up."""
+        return max(1, math.ceil(round(hours * 3600 / self.step, 6)))
+
+    def window_range(self, earliest: float, deadline: float | None = None) -> tuple[int, int]:
+        """Return the slots starting at/after ``earliest`` and ending by ``deadline``."""
+        start = bisect_left(self.timestamps, earliest)
+        if deadline is None:
+            return start, len(self.timestamps)
+        return start, bisect_right(self.timestamps, deadline - self.step)
+
+    def end_time(self, index: int) -> str:
+        """Return the ISO end time of the slot before ``index``."""
+        return dt_util.utc_from_timestamp(self.timestamps[index - 1] + self.step).isoformat()
+
+    def upcoming_range(self, now: datetime, hours: float) -> tuple[int, int]:
+        """Return the index range from the slot covering ``now`` for ``hours``."""
+        epoch = now.timestamp()
+        start = self.slot_at(epoch)
+        if start is None:
+            start = self.next_index(epoch)
+        return start, bisect_left(self.timestamps, epoch + hours * 3600)
+
+
+@dataclass(frozen=True)
+class PriceSnapshot:
+    """Immutable view of one coordinator refresh."""
+
+    current_price: float | None = None
+    current_time: str | None = None
+    current_source: str | None = None
+    forecast_24h: PriceSeries = field(default_factory=PriceSeries)
+    forecast_7d: PriceSeries = field(default_factory=PriceSeries)
+    historical: PriceSeries = field(default_factory=PriceSeries)
+    # When the data was fetched from the backend (epoch)
+    fetched_at: float = field(default_factory=time.time, compare=False)
+    # Endpoints whose fetch failed and which carry an earlier result instead
+    stale: tuple[str, ...] = field(default=(), compare=False)
+    # Memo of derived results (windows, schedules), valid for this snapshot only
+    _results: dict[Hashable, Any] = field(default_factory=dict, compare=False, repr=False)
+
+    @classmethod
+    def from_api_data(cls, data: dict[str, Any]) -> PriceSnapshot:
+        """Build a snapshot from the API client's raw payloads."""
+        current = data.get("current_price") or {}
+        return cls(
+            current_price=current.get("price"),
+            current_time=current.get("timestamp"),
+            current_source=current.get("source"),
+            forecast_24h=PriceSeries.from_decoded(data.get("predictions_24h")),
+            forecast_7d=PriceSeries.from_decoded(data.get("predictions_7d")),
+            historical=PriceSeries.from_decoded(data.get("historical")),
+            stale=tuple(data.get("stale", ())),
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> PriceSnapshot:
+        """Restore a snapshot stored with ``as_dict``."""
+        return cls(
+            current_price=data["current_price"],
+            current_time=data["current_time"],
+            current_source=data["current_source"],
+            forecast_24h=PriceSeries.from_columns(**data["forecast_24h"]),
+            forecast_7d=PriceSeries.from_columns(**data["forecast_7d"]),
+            historical=PriceSeries.from_columns(**data["historical"]),
+            fetched_at=data["fetched_at"],
+            stale=tuple(data.get("stale", ())),
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a compact, JSON-serializable representation."""
+        return {
+            "current_price": self.current_price,
+            "current_time": self.current_time,
+            "current_source": self.current_source,
+            "forecast_24h": self.forecast_24h.as_dict(),
+            "forecast_7d": self.forecast_7d.as_dict(),
+            "historical": self.historical.as_dict(),
+            "fetched_at": self.fetched_at,
+            "stale": list(self.stale),
+        }
+
+    @property
+    def age(self) -> float:
+        """Return the age of the data in seconds."""
+        return time.time() - self.fetched_at
+
+    def cached(self, key: Hashable, compute: Callable[[], _T]) -> _T:
+        """Return a derived result, computing it at most once per snapshot."""
+        if key in self._results:
+            return self._results[key]
+        if len(self._results) >= RESULT_CACHE_SIZE:
+            self._results.clear()
+        result = self._results[key] = compute()
+        return result
+
+    def discard(self, key: Hashable) -> None:
+        """Drop a derived result, such as a failed computation."""
+        self._results.pop(key, None)
+
+    def adopt_results(self, previous: PriceSnapshot | None) -> None:
+        """Reuse the derived results of an equal previous snapshot."""
+        if previous is not None and previous == self:
+            self._results.update(previous._results)
+
+    def today_index(self, now: datetime) -> PriceIndex | None:
+        """Return the sorted index of today's remaining 24h forecast prices."""
+        start, end = self.forecast_24h.today_range(now)
+        return self.cached(
+            ("today_index", start, end), lambda: self.forecast_24h.index(start, end)
+        )
+
+    def horizon(
+        self, horizon: str, now: datetime, hours: float = 24
+    ) -> tuple[PriceSeries, int, int]:
+        """Return the series and index range of a query horizon.
+
+        ``today`` is the rest of today, ``next_hours`` the next ``hours``
+        hours and ``7d`` the full 7-day forecast. The 24h forecast is used
+        whenever it covers the horizon.
+        """
+        if horizon == HORIZON_TODAY:
+            series = self.forecast_24h or self.forecast_7d
+            return series, *series.today_range(now)
+        if horizon == HORIZON_NEXT_HOURS:
+            series = self.forecast_24h if hours <= 24 and self.forecast_24h else self.forecast_7d
+            return series, *series.upcoming_range(now, hours)
+        return self.forecast_7d, *self.forecast_7d.upcoming_range(now, 7 * 24)
+
+    def planning_series(self, deadline: float | None = None) -> PriceSeries:
+        """Return the forecast to plan on: the 24h one when it reaches the deadline."""
+        if self.forecast_24h and (
+            deadline is None or deadline <= self.forecast_24h.timestamps[-1] + self.forecast_24h.step
+        ):
+            return self.forecast_24h
+        return self.forecast_7d
+
+    def cheapest_window(
+        self, hours: float, earliest: float, deadline: float | None = None
+    ) -> tuple[PriceSeries, Window | None]:
+        """Return the cheapest contiguous block of ``hours`` between two epochs."""
+        series = self.planning_series(deadline)
+        start, end = series.window_range(earliest, deadline)
+        length = series.slots(hours)
+        window = self.cached(
+            ("window", series is self.forecast_7d, start, end, length),
+            lambda: cheapest_window(series.prices, start, end, length),
+        )
+        return series, window
+
+    def load_profile_costs(
+        self,
+        profile: tuple[float, ...],
+        profile_step: float,
+        earliest: float,
+        deadline: float | None = None,
+    ) -> tuple[PriceSeries, int, int, list[float]]:
+        """Return the cost of a power profile for every possible start slot.
+
+        ``profile`` is in kW per ``profile_step`` seconds. Plans on the 7-day
+        forecast unless the 24h one reaches the deadline. Returns the series,
+        the first start index, the profile length in slots and the costs in
+        the price currency.
+        """
+        series = self.forecast_7d if deadline is None else self.planning_series(deadline)
+        start, end = series.window_range(earliest, deadline)
+        slots = resample_profile(profile, profile_step, series.step)
+        # €/MWh * kW * hours per slot / 1000 = € per slot
+        scale = series.step / 3600 / 1000
+        costs = self.cached(
+            ("profile", series is self.forecast_7d, start, end, profile_step, profile),
+            lambda: [
+                cost * scale for cost in profile_costs(series.prices, start, end, slots)
+            ],
+        )
+        return series, start, len(slots), costs
+
+    def current_at(self, now: datetime) -> CurrentPrice | None:
+        """Return the price of the slot covering ``now``.
+
+        Prefers the historical series, then the 24h forecast, so the value
+        follows the clock between refreshes. Falls back to the price derived
+        at fetch time.
+        """
+        epoch = now.timestamp()
+        for series, source in ((self.historical, "historical"), (self.forecast_24h, "forecast")):
+            index = series.slot_at(epoch)
+            if index is not None:
+                return CurrentPrice(series.prices[index], series.times[index], source)
+
+        if self.current_price is not None:
+            return CurrentPrice(self.current_price, self.current_time, self.current_source)
+        return None
+
+    def current_price_at(self, now: datetime) -> float | None:
+        """Return the price of the slot covering ``now``."""
+        current = self.current_at(now)
+        return current.price if current else None
+
+    def daily_comparison(self, now: datetime) -> tuple[float, float] | None:
+        """Return today's (24h forecast) and tomorrow's (7d forecast) average."""
+        today = self.forecast_24h.day(now.date())
+        tomorrow = self.forecast_7d.day((now + timedelta(days=1)).date())
+        if today is None or tomorrow is None:
+            return None
+        return today.average, tomorrow.average
+
+    def recommendation(self, now: datetime) -> str:
+        """Get recommendation based on current price vs today's forecast."""
+        current_price = self.current_price_at(now)
+        today = self.today_index(now)
+        if current_price is None or today is None:
+            return "unknown"
+
+        avg_price = today.average
+        min_price = today.min
+        max_price = today.max
+
+        # Calculate thresholds (bottom 25% = cheap, top 25% = expensive)
+        cheap_threshold = min_price + (max_price - min_price) * 0.25
+        expensive_threshold = min_price + (max_price - min_price) * 0.75
+
+        if current_price <= cheap_threshold:
+            return "charge"  # Good time to charge batteries / run appliances
+        elif current_price >= expensive_threshold:
+            return "discharge"  # Good time to use stored energy / sell to grid
+        elif current_price < avg_price:
+            return "neutral_cheap"
+        else:
+            return "neutral_expensive"
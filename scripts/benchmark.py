@@ -0,0 +1,209 @@
+"""Benchmark one refresh of the Electricity Price Forecast integration.
+
+Serves synthetic payloads from the local backend simulator, fetches them with
+``ElectricityForecastAPI.async_get_all_data`` and evaluates every entity
+the sensor and binary sensor platforms create, the way Home Assistant
+does after a refresh. Reports fetch time, snapshot build time, CPU time
+and allocation peak per entity, and the total per refresh and region.
+
+Needs Home Assistant installed (``pip install homeassistant``). Run from
+the repository root::
+
+    python scripts/benchmark.py
+    python scripts/benchmark.py --regions 8 --resolution 15 --iterations 50
+    python scripts/benchmark.py --json > baseline.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+
+from simulator import SimulatorConfig, async_start, create_app, runner_url
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "custom_components"))
+
+from homeassistant.components.binary_sensor import BinarySensorEntity  # noqa: E402
+from homeassistant.util import dt as dt_util  # noqa: E402
+
+from electricity_forecast import binary_sensor, sensor  # noqa: E402
+from electricity_forecast.api import ElectricityForecastAPI  # noqa: E402
+from electricity_forecast.charging import ChargingPlanner  # noqa: E402
+from electricity_forecast.const import DOMAIN, REGIONS  # noqa: E402
+from electricity_forecast.metrics import RefreshMetrics  # noqa: E402
+from electricity_forecast.snapshot import PriceSnapshot  # noqa: E402
+
+TIME_ZONE = "Europe/Berlin"
+
+
+async def create_entities(api: ElectricityForecastAPI) -> tuple[SimpleNamespace, list]:
+    """Set up both platforms against a stand-in coordinator and return the entities."""
+    coordinator = SimpleNamespace(data=None, last_update_success=True, metrics=RefreshMetrics())
+    entry = SimpleNamespace(entry_id=api.region_id, data={})
+    hass = SimpleNamespace(
+        data={
+            DOMAIN: {
+                entry.entry_id: {
+                    "coordinator": coordinator,
+                    "api": api,
+                    "charging": ChargingPlanner(),
+                }
+            }
+        }
+    )
+
+    entities: list = []
+    await sensor.async_setup_entry(hass, entry, entities.extend)
+    await binary_sensor.async_setup_entry(hass, entry, entities.extend)
+    return coordinator, entities
+
+
+def evaluate(entity) -> None:
+    """Read the properties Home Assistant reads when writing an entity's state."""
+    if isinstance(entity, BinarySensorEntity):
+        entity.is_on
+    else:
+        entity.native_value
+    entity.extra_state_attributes
+
+
+async def benchmark_region(
+    api: ElectricityForecastAPI, iterations: int
+) -> dict[str, Any]:
+    """Benchmark refreshes of one region."""
+    started = time.perf_counter()
+    data = await api.async_get_all_data()
+    fetch_cold = time.perf_counter() - started
+
+    fetch_times = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        data = await api.async_get_all_data()
+        fetch_times.append(time.perf_counter() - started)
+
+    coordinator, entities = await create_entities(api)
+    # Several entities share a class (e.g. the cheapest window sensors)
+    names = [entity.unique_id for entity in entities]
+    cpu: dict[str, list[int]] = {name: [] for name in names}
+    build_times = []
+
+    for _ in range(iterations):
+        started = time.perf_counter()
+        # A new snapshot per refresh, so shared derived results start cold
+        coordinator.data = PriceSnapshot.from_api_data(data)
+        build_times.append(time.perf_counter() - started)
+        for name, entity in zip(names, entities):
+            started_ns = time.process_time_ns()
+            evaluate(entity)
+            cpu[name].append(time.process_time_ns() - started_ns)
+
+    # Allocation peaks in a separate pass, tracemalloc skews timings
+    peaks: dict[str, int] = {}
+    coordinator.data = PriceSnapshot.from_api_data(data)
+    tracemalloc.start()
+    for name, entity in zip(names, entities):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        evaluate(entity)
+        peaks[name] = tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+
+    entity_ms = {name: statistics.mean(times) / 1e6 for name, times in cpu.items()}
+    fetch_ms = statistics.mean(fetch_times) * 1000
+    build_ms = statistics.mean(build_times) * 1000
+    return {
+        "region": api.region_id,
+        "points": {
+            "predictions_24h": len(data["predictions_24h"].timestamps),
+            "predictions_7d": len(data["predictions_7d"].timestamps),
+            "historical": len(data["historical"].timestamps),
+        },
+        "fetch_cold_ms": round(fetch_cold * 1000, 3),
+        "fetch_ms": round(fetch_ms, 3),
+        "snapshot_ms": round(build_ms, 3),
+        "entities_ms": round(sum(entity_ms.values()), 3),
+        "refresh_ms": round(fetch_ms + build_ms + sum(entity_ms.values()), 3),
+        "entities": {
+            name: {"cpu_ms": round(entity_ms[name], 4), "alloc_peak_kib": round(peaks[name] / 1024, 1)}
+            for name in names
+        },
+    }
+
+
+async def run(args: argparse.Namespace) -> list[dict[str, Any]]:
+    """Run the benchmark for every requested resolution."""
+    dt_util.set_default_time_zone(dt_util.get_time_zone(TIME_ZONE))
+    regions = list(REGIONS)[: args.regions]
+    results = []
+
+    for step in args.resolution:
+        runner = await async_start(create_app(SimulatorConfig(step=step * 60)))
+
+        try:
+            async with aiohttp.ClientSession() as session:
+                url = runner_url(runner)
+                for region in regions:
+                    api = ElectricityForecastAPI(url, session, region)
+                    result = await benchmark_region(api, args.iterations)
+                    result["resolution_minutes"] = step
+                    results.append(result)
+        finally:
+            await runner.cleanup()
+
+    return results
+
+
+def print_report(results: list[dict[str, Any]]) -> None:
+    """Print a human-readable report."""
+    for result in results:
+        points = result["points"]
+        print(
+            f"\n{result['region']} @ {result['resolution_minutes']} min "
+            f"({points['predictions_24h']}/{points['predictions_7d']}/{points['historical']} points)"
+        )
+        print(
+            f"  fetch {result['fetch_ms']:.2f} ms (cold {result['fetch_cold_ms']:.2f} ms), "
+            f"snapshot {result['snapshot_ms']:.2f} ms, entities {result['entities_ms']:.2f} ms, "
+            f"refresh {result['refresh_ms']:.2f} ms"
+        )
+        print(f"  {'entity':<36} {'cpu ms':>9} {'alloc KiB':>10}")
+        for name, entity in sorted(
+            result["entities"].items(), key=lambda item: -item[1]["cpu_ms"]
+        ):
+            print(f"  {name:<36} {entity['cpu_ms']:>9.4f} {entity['alloc_peak_kib']:>10.1f}")
+
+
+def main() -> None:
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--regions", type=int, default=1, help="number of regions (max 8)")
+    parser.add_argument("--iterations", type=int, default=20, help="refreshes per region")
+    parser.add_argument(
+        "--resolution",
+        type=int,
+        nargs="+",
+        choices=(60, 15),
+        default=[60, 15],
+        help="slot length(s) in minutes",
+    )
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+
+
+if __name__ == "__main__":
+    main()
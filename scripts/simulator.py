@@ -0,0 +1,334 @@
+"""Local stand-in for the Electricity Price Forecast backend.
+
+Implements ``/health``, ``/api/predictions/{region}/next-24h``,
+``/api/predictions/{region}/next-7d`` and
+``/api/historical/{region}/combined`` with deterministic synthetic price
+curves for any region name, plus injectable faults: latency with jitter,
+HTTP errors, truncated JSON bodies and slow streaming.
+
+Serve it and point the integration (or curl) at it::
+
+    python scripts/simulator.py serve --port 8000
+    python scripts/simulator.py serve --latency 0.5 --jitter 0.2 --error-rate 0.05
+
+Or load-test ``ElectricityForecastAPI`` against an embedded instance, which
+needs Home Assistant installed (``pip install homeassistant``)::
+
+    python scripts/simulator.py load --regions 50 --rounds 5
+    python scripts/simulator.py load --regions 200 --truncate-rate 0.02 --timeout 5
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import statistics
+import sys
+import time
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+from aiohttp import web
+
+# Request and fault counters of a simulator app
+STATS = web.AppKey("stats", dict)
+
+
+@dataclass
+class SimulatorConfig:
+    """Payload resolution and faults injected into every API response."""
+
+    # Slot length of the synthetic data, in seconds
+    step: int = 3600
+    # Delay before each response, and the random +/- spread on it, in seconds
+    latency: float = 0.0
+    jitter: float = 0.0
+    # Share of API responses answered with HTTP 503
+    error_rate: float = 0.0
+    # Share of API responses whose JSON body is cut off halfway
+    truncate_rate: float = 0.0
+    # Stream bodies in chunks of this many bytes with a pause in between
+    chunk_size: int = 0
+    chunk_delay: float = 0.0
+    # Seed for the fault dice, the price curves do not depend on it
+    seed: int | None = None
+
+
+def synthetic_price(region: str, epoch: float) -> float:
+    """Return a deterministic price (€/MWh) for a region and time.
+
+    Morning and evening peaks, a midday solar dip and cheaper weekends,
+    plus noise seeded by region and timestamp so overlapping windows agree.
+    """
+    hour = (epoch % 86400) / 3600 + 1
+    weekday = int(epoch // 86400 + 3) % 7
+    price = 85 + 25 * math.sin((hour - 4) * math.pi / 12) ** 2
+    price -= 30 * math.exp(-((hour - 13) ** 2) / 6)
+    if weekday >= 5:
+        price *= 0.85
+    return round(price + random.Random(f"{region}:{int(epoch)}").gauss(0, 6), 2)
+
+
+def synthetic_rows(region: str, start: float, count: int, step: int, forecast: bool) -> list[dict]:
+    """Return backend rows for ``count`` slots of ``step`` seconds from ``start``."""
+    rows = []
+    for index in range(count):
+        epoch = start + index * step
+        timestamp = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(epoch))
+        price = synthetic_price(region, epoch)
+        if forecast:
+            spread = 5 + index * step / 3600 * 0.2
+            rows.append(
+                {
+                    "timestamp": timestamp,
+                    "predicted_price": price,
+                    "confidence_lower": round(price - spread, 2),
+                    "confidence_upper": round(price + spread, 2),
+                }
+            )
+        else:
+            rows.append({"timestamp": timestamp, "price": price})
+    return rows
+
+
+def create_app(config: SimulatorConfig | None = None) -> web.Application:
+    """Return the simulator application."""
+    config = config or SimulatorConfig()
+    step = config.step
+    per_hour = 3600 // step
+    dice = random.Random(config.seed)
+    stats = {"requests": 0, "errors": 0, "truncated": 0}
+
+    def slot_start(epoch: float) -> float:
+        return epoch - epoch % step
+
+    async def respond(request: web.Request, payload: Any) -> web.StreamResponse:
+        """Send a payload with the configured faults applied."""
+        stats["requests"] += 1
+        if config.latency or config.jitter:
+            await asyncio.sleep(max(0.0, config.latency + dice.uniform(-1, 1) * config.jitter))
+
+        if dice.random() < config.error_rate:
+            stats["errors"] += 1
+            raise web.HTTPServiceUnavailable(text="simulated failure")
+
+        body = json.dumps(payload).encode()
+        if dice.random() < config.truncate_rate:
+            stats["truncated"] += 1
+            body = body[: len(body) // 2]
+
+        if not config.chunk_size:
+            return web.Response(body=body, content_type="application/json")
+
+        response = web.StreamResponse(headers={"Content-Type": "application/json"})
+        response.content_length = len(body)
+        await response.prepare(request)
+        try:
+            for offset in range(0, len(body), config.chunk_size):
+                if offset:
+                    await asyncio.sleep(config.chunk_delay)
+                await response.write(body[offset : offset + config.chunk_size])
+            await response.write_eof()
+        except ConnectionResetError:
+            # Client gave up (timeout), nothing left to send
+            pass
+        return response
+
+    async def health(request: web.Request) -> web.Response:
+        return web.json_response({"status": "healthy"})
+
+    async def next_24h(request: web.Request) -> web.StreamResponse:
+        region = request.match_info["region"]
+        start = slot_start(time.time())
+        return await respond(request, synthetic_rows(region, start, 24 * per_hour, step, True))
+
+    async def next_7d(request: web.Request) -> web.StreamResponse:
+        region = request.match_info["region"]
+        start = slot_start(time.time())
+        return await respond(request, synthetic_rows(region, start, 168 * per_hour, step, True))
+
+    async def historical(request: web.Request) -> web.StreamResponse:
+        region = request.match_info["region"]
+        count = int(request.query.get("hours", 168)) * per_hour
+        start = slot_start(time.time()) - (count - 1) * step
+        return await respond(
+            request, {"region": region, "data": synthetic_rows(region, start, count, step, False)}
+        )
+
+    app = web.Application()
+    app[STATS] = stats
+    app.router.add_get("/health", health)
+    app.router.add_get("/api/predictions/{region}/next-24h", next_24h)
+    app.router.add_get("/api/predictions/{region}/next-7d", next_7d)
+    app.router.add_get("/api/historical/{region}/combined", historical)
+    return app
+
+
+async def async_start(app: web.Application, host: str = "127.0.0.1", port: int = 0) -> web.AppRunner:
+    """Start serving an app and return its runner (``port`` 0 picks a free one)."""
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+def runner_url(runner: web.AppRunner) -> str:
+    """Return the base URL a started runner listens on."""
+    host, port = runner.addresses[0][:2]
+    return f"http://{host}:{port}"
+
+
+def _percentile(values: list[float], share: float) -> float:
+    """Return a nearest-rank percentile of unsorted values."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+async def load_test(args: argparse.Namespace, config: SimulatorConfig) -> dict[str, Any]:
+    """Refresh many regions concurrently against an embedded simulator."""
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "custom_components"))
+    from electricity_forecast.api import (
+        CircuitBreaker,
+        CircuitOpenError,
+        ElectricityForecastAPI,
+        RequestGate,
+    )
+
+    app = create_app(config)
+    runner = await async_start(app)
+    url = runner_url(runner)
+    regions = [f"R{index:03d}" for index in range(args.regions)]
+    latencies: list[float] = []
+    failures: dict[str, int] = {}
+
+    async def refresh(api: ElectricityForecastAPI) -> None:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(api.async_get_all_data(), args.timeout)
+        except Exception as err:  # noqa: BLE001 - every failure kind is counted
+            # Refreshes refused by the open circuit never reached the backend
+            name = "circuit_open" if isinstance(err, CircuitOpenError) else type(err).__name__
+            failures[name] = failures.get(name, 0) + 1
+        else:
+            latencies.append(time.perf_counter() - started)
+
+    try:
+        async with aiohttp.ClientSession() as session:
+            # One gate and breaker for all regions, as ElectricityForecastHub.create_api
+            gate = RequestGate()
+            breaker = CircuitBreaker()
+            apis = [
+                ElectricityForecastAPI(url, session, region, gate, breaker) for region in regions
+            ]
+            started = time.perf_counter()
+            for _ in range(args.rounds):
+                await asyncio.gather(*(refresh(api) for api in apis))
+            elapsed = time.perf_counter() - started
+    finally:
+        await runner.cleanup()
+
+    refreshes = len(regions) * args.rounds
+    result: dict[str, Any] = {
+        "regions": len(regions),
+        "rounds": args.rounds,
+        "refreshes": refreshes,
+        "succeeded": len(latencies),
+        "failures": failures,
+        "elapsed_s": round(elapsed, 3),
+        "refreshes_per_s": round(refreshes / elapsed, 2),
+        "breaker": {
+            "openings": breaker.openings,
+            "open": breaker.is_open,
+            "retry_in_s": round(max(0.0, breaker.retry_at - time.time()), 1)
+            if breaker.retry_at is not None
+            else None,
+        },
+        "server": dict(app[STATS]),
+    }
+    if latencies:
+        result["latency_ms"] = {
+            "mean": round(statistics.mean(latencies) * 1000, 2),
+            "p50": round(_percentile(latencies, 0.5) * 1000, 2),
+            "p95": round(_percentile(latencies, 0.95) * 1000, 2),
+            "max": round(max(latencies) * 1000, 2),
+        }
+    return result
+
+
+async def serve(args: argparse.Namespace, config: SimulatorConfig) -> None:
+    """Serve the simulator until interrupted."""
+    runner = await async_start(create_app(config), args.host, args.port)
+    print(f"Simulator listening on {runner_url(runner)}", file=sys.stderr)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    """Parse arguments and serve or load-test the simulator."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resolution", type=int, choices=(60, 15), default=60, help="slot length in minutes")
+    parser.add_argument("--latency", type=float, default=0.0, help="response delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random +/- spread on the delay")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of HTTP 503 responses")
+    parser.add_argument("--truncate-rate", type=float, default=0.0, help="share of cut-off JSON bodies")
+    parser.add_argument("--chunk-size", type=int, default=0, help="stream bodies in chunks of this many bytes")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="pause between chunks in seconds")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the fault dice")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="serve until interrupted")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8000)
+
+    load_parser = commands.add_parser("load", help="load-test ElectricityForecastAPI")
+    load_parser.add_argument("--regions", type=int, default=20, help="regions refreshed concurrently")
+    load_parser.add_argument("--rounds", type=int, default=3, help="refreshes per region")
+    load_parser.add_argument("--timeout", type=float, default=30.0, help="deadline per refresh in seconds")
+    load_parser.add_argument("--json", action="store_true", help="print results as JSON")
+
+    args = parser.parse_args()
+    options = {field.name for field in fields(SimulatorConfig)}
+    config = SimulatorConfig(
+        step=args.resolution * 60,
+        **{name: value for name, value in vars(args).items() if name in options},
+    )
+
+    if args.command == "serve":
+        try:
+            asyncio.run(serve(args, config))
+        except KeyboardInterrupt:
+            pass
+        return
+
+    result = asyncio.run(load_test(args, config))
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+    print(
+        f"{result['succeeded']}/{result['refreshes']} refreshes of {result['regions']} regions "
+        f"in {result['elapsed_s']:.2f} s ({result['refreshes_per_s']:.1f}/s)"
+    )
+    if "latency_ms" in result:
+        latency = result["latency_ms"]
+        print(
+            f"latency mean {latency['mean']:.1f} ms, p50 {latency['p50']:.1f} ms, "
+            f"p95 {latency['p95']:.1f} ms, max {latency['max']:.1f} ms"
+        )
+    if result["failures"]:
+        print("failures: " + ", ".join(f"{name} x{count}" for name, count in result["failures"].items()))
+    breaker = result["breaker"]
+    if breaker["openings"]:
+        state = f"open, retry in {breaker['retry_in_s']:.0f} s" if breaker["open"] else "closed"
+        print(f"circuit breaker: opened {breaker['openings']} time(s), {state}")
+    server = result["server"]
+    print(f"server: {server['requests']} requests, {server['errors']} errors, {server['truncated']} truncated")
+
+
+if __name__ == "__main__":
+    main()